@@ -0,0 +1,186 @@
+"""
+The benchmark cases, one per block type.
+
+Every case builds the raw (JSON) data for a block with a given number of
+children and returns a function that converts and renders it, the way a page
+view does. Pages and images are shared between children from a small pool,
+so building the 10,000 children cases stays quick.
+"""
+from __future__ import unicode_literals
+
+from collections import OrderedDict
+from types import SimpleNamespace
+
+from django.template import Context, Template
+from django.test import RequestFactory
+from wagtail.core.blocks import StreamBlock
+from wagtail.images.tests.utils import Image, get_test_image_file
+from wagtail_factories import PageFactory, SiteFactory
+
+from omni_blocks.blocks.chooser_blocks import PageChooserTemplateBlock
+from omni_blocks.blocks.image_blocks import ImageGridBlock
+from omni_blocks.blocks.list_blocks import BasicCardGridBlock, FlowListBlock, ULBlock
+from omni_blocks.blocks.struct_blocks import LinkBlock, TwoColumnBlock
+from omni_blocks.blocks.text_blocks import JumpHBlock
+
+
+POOL_SIZE = 20
+
+
+class Fixtures(object):
+    """Pages and images shared by the benchmark cases, created on first use."""
+
+    def __init__(self):
+        self._pages = None
+        self._images = None
+        self.request = RequestFactory().get("/")
+
+    @property
+    def pages(self):
+        if self._pages is None:
+            root = PageFactory.create(title="home", parent=None)
+            SiteFactory.create(root_page=root, is_default_site=True)
+            self._pages = [
+                PageFactory.create(title="Page {}".format(i), parent=root)
+                for i in range(POOL_SIZE)
+            ]
+        return self._pages
+
+    @property
+    def images(self):
+        if self._images is None:
+            self._images = [
+                Image.objects.create(
+                    title="Image {}".format(i), file=get_test_image_file()
+                )
+                for i in range(POOL_SIZE)
+            ]
+        return self._images
+
+    def page_id(self, index):
+        return self.pages[index % POOL_SIZE].pk
+
+    def image_id(self, index):
+        return self.images[index % POOL_SIZE].pk
+
+    def link(self, index):
+        """Alternate between internal and external links."""
+        if index % 2:
+            return {"external_url": "https://example.com/{}/".format(index)}
+        return {"internal_url": self.page_id(index)}
+
+
+def render_block(block, raw, context):
+    """Return a function converting and rendering `raw` with `block`."""
+
+    def render():
+        return block.render(block.to_python(raw), context=context)
+
+    return render
+
+
+def link_block(fixtures, size):
+    block = StreamBlock([("link", LinkBlock())])
+    raw = [{"type": "link", "value": fixtures.link(i)} for i in range(size)]
+    return render_block(block, raw, {"request": fixtures.request})
+
+
+def basic_card_grid_block(fixtures, size):
+    block = BasicCardGridBlock()
+    raw = [
+        {
+            "title": "Card {}".format(i),
+            "image": fixtures.image_id(i),
+            "link": fixtures.link(i),
+            "description": "Description of card {}".format(i),
+        }
+        for i in range(size)
+    ]
+    return render_block(block, raw, {"request": fixtures.request})
+
+
+def image_grid_block(fixtures, size):
+    block = ImageGridBlock()
+    raw = [fixtures.image_id(i) for i in range(size)]
+    return render_block(block, raw, {"request": fixtures.request})
+
+
+def two_column_block(fixtures, size):
+    block = StreamBlock([("two_column", TwoColumnBlock())])
+    raw = [
+        {
+            "type": "two_column",
+            "value": {
+                "left_column": {"image": fixtures.image_id(i)},
+                "right_column": {"paragraph": "<p>Paragraph {}</p>".format(i)},
+            },
+        }
+        for i in range(size)
+    ]
+    return render_block(block, raw, {"request": fixtures.request})
+
+
+def flow_list_block(fixtures, size):
+    block = FlowListBlock()
+    raw = [
+        {
+            "meta_title": "Step {}".format(i),
+            "title": "Title {}".format(i),
+            "body": "<p>Body {}</p>".format(i),
+            "image": fixtures.image_id(i),
+            "link": fixtures.link(i),
+        }
+        for i in range(size)
+    ]
+    return render_block(block, raw, {"request": fixtures.request})
+
+
+def ul_block(fixtures, size):
+    block = ULBlock()
+    raw = ["List item {} & more".format(i) for i in range(size)]
+    return render_block(block, raw, {"request": fixtures.request})
+
+
+def page_chooser_template_block(fixtures, size):
+    block = StreamBlock([("page", PageChooserTemplateBlock())])
+    raw = [{"type": "page", "value": fixtures.page_id(i)} for i in range(size)]
+    return render_block(block, raw, {"request": fixtures.request})
+
+
+JUMPLIST_TEMPLATE = Template(
+    "{% load wagtailcore_tags omni_blocks_tags %}"
+    "{% has_jumplist page 'body' as has_jumplist %}"
+    "{% if has_jumplist %}{% get_jumplist page 'body' as anchors %}"
+    "{% for anchor in anchors %}"
+    "<a href='{{ anchor.href }}'>{{ anchor.value }}</a>"
+    "{% endfor %}"
+    "{% endif %}"
+    "{% include_block page.body %}"
+)
+
+
+def jump_h_block(fixtures, size):
+    block = StreamBlock([("heading", JumpHBlock(tag="h2"))])
+    raw = [{"type": "heading", "value": "Heading {}".format(i)} for i in range(size)]
+
+    def render():
+        # A fresh request per render, as the jumplist index is cached per request
+        request = RequestFactory().get("/")
+        page = SimpleNamespace(pk=1, body=block.to_python(raw))
+        return JUMPLIST_TEMPLATE.render(Context({"page": page, "request": request}))
+
+    return render
+
+
+CASES = OrderedDict(
+    [
+        ("LinkBlock", link_block),
+        ("BasicCardGridBlock", basic_card_grid_block),
+        ("ImageGridBlock", image_grid_block),
+        ("TwoColumnBlock", two_column_block),
+        ("FlowListBlock", flow_list_block),
+        ("ULBlock", ul_block),
+        ("PageChooserTemplateBlock", page_chooser_template_block),
+        ("JumpHBlock", jump_h_block),
+    ]
+)
@@ -0,0 +1,184 @@
+"""
+Runs the benchmark cases and compares them against a stored baseline.
+
+For every case and size this reports the median wall time of the render, the
+number of queries it runs and its peak traced memory allocation.
+"""
+from __future__ import unicode_literals
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+from django.db import connection
+
+from benchmarks.cases import CASES, Fixtures
+
+
+SIZES = (1, 100, 10000)
+DEFAULT_BASELINE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "baseline.json"
+)
+
+
+class QueryCounter(object):
+    """Database execute wrapper counting queries, without the 9000 query log limit."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def measure(render, repeat):
+    """
+    Measure a render function.
+
+    Time, queries and allocations are measured in separate runs, so tracing
+    does not skew the timings.
+
+    :param render: Function rendering the block.
+    :param repeat: Number of timed runs.
+    :return: Dict of the median time in ms, the query count and the peak KiB.
+    """
+    # Warm up: generates renditions and fills the template loader cache
+    render()
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        render()
+        times.append((time.perf_counter() - start) * 1000)
+
+    queries = QueryCounter()
+    with connection.execute_wrapper(queries):
+        render()
+
+    tracemalloc.start()
+    try:
+        render()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "time_ms": round(statistics.median(times), 3),
+        "queries": queries.count,
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def compare(result, baseline, tolerance):
+    """
+    Compare a result with its baseline.
+
+    :param result: The measured result.
+    :param baseline: The baseline result, or None.
+    :param tolerance: Allowed relative increase of time and memory.
+    :return: List of regression descriptions.
+    """
+    if not baseline:
+        return []
+
+    regressions = []
+    if result["queries"] > baseline["queries"]:
+        regressions.append(
+            "queries {queries} > {0}".format(baseline["queries"], **result)
+        )
+    for key in ("time_ms", "peak_kib"):
+        if result[key] > baseline[key] * (1 + tolerance):
+            regressions.append("{0} {1} > {2}".format(key, result[key], baseline[key]))
+    return regressions
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description="Benchmark the rendering of omni_blocks."
+    )
+    parser.add_argument(
+        "cases", nargs="*", help="Cases to run, defaults to all of them."
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--repeat", type=int, default=5, help="Number of timed runs.")
+    parser.add_argument(
+        "--baseline", default=DEFAULT_BASELINE, help="Baseline JSON file."
+    )
+    parser.add_argument(
+        "--save", action="store_true", help="Save the results as the baseline."
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Allowed relative increase of time and memory over the baseline.",
+    )
+    return parser.parse_args(argv)
+
+
+def write(line, stream=None):
+    """Write a line of the report, to stdout by default."""
+    (stream or sys.stdout).write(line + "\n")
+
+
+def run(argv=None):
+    """
+    Run the benchmarks.
+
+    :param argv: Command line arguments.
+    :return: Exit code, 1 if any case regressed against the baseline.
+    """
+    args = parse_args(argv)
+    unknown = set(args.cases) - set(CASES)
+    if unknown:
+        write("Unknown cases: {}".format(", ".join(sorted(unknown))), sys.stderr)
+        return 2
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+
+    fixtures = Fixtures()
+    results = {}
+    failed = False
+    row = "{:<26} {:>6} {:>11} {:>8} {:>11}  {}"
+    write(row.format("case", "size", "time (ms)", "queries", "peak (KiB)", "baseline"))
+    for name, case in CASES.items():
+        if args.cases and name not in args.cases:
+            continue
+        for size in args.sizes:
+            result = measure(case(fixtures, size), args.repeat)
+            results.setdefault(name, {})[str(size)] = result
+            previous = baseline.get(name, {}).get(str(size))
+            regressions = compare(result, previous, args.tolerance)
+            failed = failed or bool(regressions)
+            if previous is None:
+                status = "-"
+            else:
+                status = "REGRESSED: " + ", ".join(regressions) if regressions else "ok"
+            write(
+                row.format(
+                    name,
+                    size,
+                    result["time_ms"],
+                    result["queries"],
+                    result["peak_kib"],
+                    status,
+                )
+            )
+
+    if args.save:
+        for name, sizes in results.items():
+            baseline.setdefault(name, {}).update(sizes)
+        with open(args.baseline, "w") as baseline_file:
+            json.dump(baseline, baseline_file, indent=2, sort_keys=True)
+        write("Saved baseline to {}".format(args.baseline))
+        return 0
+
+    return 1 if failed else 0
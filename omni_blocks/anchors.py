@@ -0,0 +1,66 @@
+from __future__ import unicode_literals
+
+from functools import lru_cache
+
+from django.utils.text import slugify
+
+
+#: Number of distinct heading texts whose slugs are kept in memory.
+SLUG_CACHE_SIZE = 2048
+
+REQUEST_ATTR = "_omni_blocks_anchors"
+
+
+@lru_cache(maxsize=SLUG_CACHE_SIZE)
+def cached_slugify(value):
+    """Slugify a heading, remembering the most recently used slugs."""
+    return slugify(value)
+
+
+class AnchorAllocator(object):
+    """
+    Hands out HTML ids that are unique within a page.
+
+    An id that is already taken gets a numbered suffix, so two headings with
+    the same text become e.g. `heading-intro` and `heading-intro-2`.
+    """
+
+    def __init__(self):
+        self.taken = set()
+
+    def allocate(self, base):
+        """
+        Allocate a new unique id.
+
+        :param base: The id wanted, e.g. the slug of the heading.
+        :return: The base id, or the base id with the first free suffix.
+        """
+        anchor = base
+        suffix = 2
+        while anchor in self.taken:
+            anchor = "{0}-{1}".format(base, suffix)
+            suffix += 1
+        self.taken.add(anchor)
+        return anchor
+
+    def reserve(self, anchor):
+        """
+        Reserve an id already allocated elsewhere (e.g. by a jumplist) for a heading.
+
+        :param anchor: The unique id allocated for the heading.
+        """
+        self.taken.add(anchor)
+
+
+def get_request_anchors(request):
+    """
+    Get the anchor allocator of a request, creating it on first use.
+
+    :param request: The current request.
+    :return: AnchorAllocator
+    """
+    allocator = getattr(request, REQUEST_ATTR, None)
+    if allocator is None:
+        allocator = AnchorAllocator()
+        setattr(request, REQUEST_ATTR, allocator)
+    return allocator
@@ -0,0 +1,54 @@
+from __future__ import unicode_literals
+
+from wagtail.api.v2.serializers import StreamField
+from wagtail.core.blocks import StreamValue
+
+from omni_blocks.prefetch import get_stream_renditions, prefetch_link_pages
+from omni_blocks.renditions import prefetch_renditions
+
+
+def prefetch_api_representation(stream_value):
+    """
+    Load everything the API representation of a StreamValue shows, in bulk.
+
+    The chosen pages and images are loaded with one query per model, and the
+    renditions with one query per set of filter specs, however many blocks
+    the stream has.
+
+    :param stream_value: A StreamValue, usually a page's StreamField value.
+    :return: The same StreamValue, with its children converted.
+    """
+    if not isinstance(stream_value, StreamValue):
+        return stream_value
+
+    prefetch_link_pages(stream_value, choosers=True)
+
+    for specs, images in get_stream_renditions(stream_value).items():
+        prefetch_renditions(images, specs)
+    return stream_value
+
+
+def get_api_representation(stream_value, context=None):
+    """
+    Get the API representation of a StreamValue, with resolved URLs and rendition URLs.
+
+    :param stream_value: A StreamValue.
+    :param context: The serializer context.
+    :return: List of the children's representations.
+    """
+    prefetch_api_representation(stream_value)
+    stream_block = stream_value.stream_block
+    return stream_block.get_api_representation(stream_value, context=context)
+
+
+class StreamFieldSerializer(StreamField):
+    """
+    Serializer for StreamFields of omni_blocks, for the Wagtail API.
+
+    Used as `APIField("body", serializer=StreamFieldSerializer())`, it loads
+    the pages, images and renditions of the whole field in bulk.
+    """
+
+    def to_representation(self, value):
+        prefetch_api_representation(value)
+        return super(StreamFieldSerializer, self).to_representation(value)
@@ -4,3 +4,13 @@ from django.apps import AppConfig
 
 class OmniBlocksConfig(AppConfig):
     name = "omni_blocks"
+
+    def ready(self):
+        # Connect the signal handlers prerendering blocks, warming renditions and
+        # indexing references on publish
+        from omni_blocks import (  # noqa: F401
+            placeholders,
+            prerender,
+            references,
+            warming,
+        )
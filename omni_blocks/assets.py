@@ -0,0 +1,40 @@
+from __future__ import unicode_literals
+
+
+REQUEST_ATTR = "_omni_blocks_assets"
+
+#: The script loading Google Maps for every `GoogleMapBlock` on the page.
+GOOGLE_MAPS = "google_maps"
+
+
+class AssetRegistry(object):
+    """The scripts and styles already output in a request."""
+
+    def __init__(self):
+        self.included = set()
+
+    def include(self, name):
+        """
+        Register an asset as output.
+
+        :param name: The name of the asset.
+        :return: True the first time an asset is included, False afterwards.
+        """
+        if name in self.included:
+            return False
+        self.included.add(name)
+        return True
+
+
+def get_request_assets(request):
+    """
+    Get the asset registry shared by every block rendered for a request.
+
+    :param request: The current request.
+    :return: AssetRegistry - The registry, created on first use.
+    """
+    registry = getattr(request, REQUEST_ATTR, None)
+    if registry is None:
+        registry = AssetRegistry()
+        setattr(request, REQUEST_ATTR, registry)
+    return registry
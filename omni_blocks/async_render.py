@@ -0,0 +1,144 @@
+from __future__ import unicode_literals
+
+import asyncio
+from functools import partial
+
+from django.db import close_old_connections, connection
+from wagtail.core.blocks import StreamValue
+from wagtail.core.models import Page
+
+from omni_blocks.blocks.chooser_blocks import PageChooserTemplateBlock
+from omni_blocks.blocks.mixins import (
+    BulkChooserMixin,
+    load_chooser_instances,
+    prefetched_choosers,
+    prefetched_pages,
+)
+from omni_blocks.prefetch import (
+    get_link_page_ids,
+    get_stream_renditions,
+    iter_raw_values,
+    load_pages,
+)
+from omni_blocks.renditions import prefetch_renditions
+
+
+def call_with_connection(function, *args, **kwargs):
+    """
+    Call a function in an executor thread, closing the thread's connection after.
+
+    Executor threads outlive the calls, and Django only closes the connections
+    of the threads serving requests, so each call gets a connection of its own,
+    like `warming.run_in_worker`. A connection in a transaction is left open,
+    as it belongs to the code that started the transaction.
+
+    :param function: The function to call.
+    :return: The function's result.
+    """
+    if connection.in_atomic_block:
+        return function(*args, **kwargs)
+    close_old_connections()
+    try:
+        return function(*args, **kwargs)
+    finally:
+        connection.close()
+
+
+def run_in_executor(executor, function, *args, **kwargs):
+    """
+    Run a blocking function in an executor, without blocking the event loop.
+
+    :param executor: A `concurrent.futures.Executor`, or None for the loop's default one.
+    :param function: The function to call, see `call_with_connection`.
+    :return: An awaitable of the function's result.
+    """
+    loop = asyncio.get_event_loop()
+    return loop.run_in_executor(
+        executor, partial(call_with_connection, function, *args, **kwargs)
+    )
+
+
+def convert_stream(stream_value, pages, instances):
+    """
+    Convert a StreamValue using the pages and instances already loaded.
+
+    Nested StreamValues are converted as they are walked, so the walk and the
+    grouping of the images by filter specs happen here, in the worker thread.
+
+    :param stream_value: A lazy StreamValue.
+    :param pages: Dict of page id to page, or to `None` for missing pages.
+    :param instances: Dict of model to a dict of pk to instance, as
+        `prefetched_choosers` takes.
+    :return: Dict of a tuple of filter specs to a list of images.
+    """
+    # The prefetched values are thread local, so they are set up in the worker thread
+    with prefetched_pages(pages), prefetched_choosers(instances):
+        return get_stream_renditions(stream_value)
+
+
+async def prefetch_stream_async(stream_value, executor=None):
+    """
+    Load the pages, images and renditions a StreamValue renders, concurrently.
+
+    The links' pages, the page choosers' specific pages and the other chooser
+    values are loaded at the same time, then the renditions of every set of
+    filter specs. Each query runs in the executor.
+
+    :param stream_value: A StreamValue, usually a page's StreamField value.
+    :param executor: A `concurrent.futures.Executor`, or None for the loop's default.
+    :return: The same StreamValue, with its children converted.
+    """
+    if not isinstance(stream_value, StreamValue):
+        return stream_value
+
+    raw_values = list(iter_raw_values(stream_value))
+    link_page_ids = get_link_page_ids(raw_values)
+    chooser_page_ids = set()
+    chooser_values = []
+    for block, value in raw_values:
+        if isinstance(block, PageChooserTemplateBlock):
+            page_id = block.get_page_id(value)
+            if page_id is not None:
+                chooser_page_ids.add(page_id)
+        elif isinstance(block, BulkChooserMixin) and not issubclass(
+            block.target_model, Page
+        ):
+            # Chosen pages are the links' pages, loaded above
+            chooser_values.append((block, value))
+
+    link_pages, chooser_pages, instances = await asyncio.gather(
+        run_in_executor(executor, load_pages, link_page_ids),
+        run_in_executor(executor, load_pages, chooser_page_ids, specific=True),
+        run_in_executor(executor, load_chooser_instances, chooser_values),
+    )
+    pages = dict(link_pages)
+    pages.update(chooser_pages)
+    images_by_specs = await run_in_executor(
+        executor, convert_stream, stream_value, pages, instances
+    )
+
+    await asyncio.gather(
+        *[
+            run_in_executor(executor, prefetch_renditions, images, specs)
+            for specs, images in images_by_specs.items()
+        ]
+    )
+    return stream_value
+
+
+async def render_stream_async(stream_value, context=None, executor=None):
+    """
+    Render a StreamValue from async code, without blocking the event loop.
+
+    Everything the blocks look up is loaded with `prefetch_stream_async`,
+    then the stream is rendered in the executor.
+
+    :param stream_value: A StreamValue, usually a page's StreamField value.
+    :param context: The context to render the blocks with.
+    :param executor: A `concurrent.futures.Executor`, or None for the loop's default.
+    :return: The rendered HTML.
+    """
+    await prefetch_stream_async(stream_value, executor=executor)
+    return await run_in_executor(
+        executor, stream_value.stream_block.render, stream_value, context=context
+    )
@@ -1,17 +1,94 @@
 from __future__ import unicode_literals
 
-from django.template.loader import render_to_string
+from django.core.exceptions import ValidationError
 from wagtail.core.blocks import PageChooserBlock
+from wagtail.core.models import Page
+from wagtail.images.blocks import ImageChooserBlock
 
+from omni_blocks.blocks.mixins import (
+    BulkChooserMixin,
+    FragmentCacheMixin,
+    get_prefetched_pages,
+)
+from omni_blocks.instrumentation import instrument_render
+from omni_blocks.page_urls import get_page_url
+from omni_blocks.prefetch import load_pages
+from omni_blocks.template_cache import get_block_template
 
-class PageChooserTemplateBlock(PageChooserBlock):
-    """Page chooser block that renders from a template."""
+
+@instrument_render
+class PageChooserTemplateBlock(FragmentCacheMixin, PageChooserBlock):
+    """
+    Page chooser block that renders from a template.
+
+    The chosen page is converted to its specific subclass, so the template can
+    show the fields of the page type. A StreamField loads the pages of all
+    these blocks together, with one query per page type, through `bulk_to_python`.
+    """
 
     template = "blocks/page_chooser_block.html"
 
+    @staticmethod
+    def get_page_id(value):
+        """Get the page id of a raw value, or None if it is empty or not a valid id."""
+        if value in (None, ""):
+            return None
+        try:
+            return Page._meta.pk.to_python(value)
+        except ValidationError:
+            return None
+
+    def bulk_to_python(self, values):
+        """
+        Convert several page ids to specific pages, loading them together.
+
+        Specific pages made available by `prefetched_pages` are not loaded again.
+
+        :param values: List of page ids.
+        :return: List of specific pages, or None for missing ones, in the same order.
+        """
+        page_ids = [self.get_page_id(value) for value in values]
+        pages = {
+            page_id: page
+            for page_id, page in get_prefetched_pages().items()
+            if page is None or type(page) is page.specific_class
+        }
+        missing = [
+            page_id
+            for page_id in page_ids
+            if page_id is not None and page_id not in pages
+        ]
+        pages.update(load_pages(missing, specific=True))
+        return [pages.get(page_id) for page_id in page_ids]
+
+    def to_python(self, value):
+        """Convert a page id to the specific page."""
+        return self.bulk_to_python([value])[0]
+
+    def get_api_representation(self, value, context=None):
+        """Represent the page with the fields its template shows, rather than its id."""
+        if not value:
+            return None
+        return {
+            "id": value.pk,
+            "title": value.title,
+            "url": get_page_url(value, request=(context or {}).get("request")),
+            "teaser": getattr(value, "teaser", None),
+        }
+
     def render_basic(self, value, context=None):
         """Override render_basic to use provided template."""
         if value:
-            return render_to_string(self.template, {"page": value})
+            request = (context or {}).get("request")
+            template = get_block_template(self.template)
+            return template.render({"page": value, "request": request})
         else:
             return ""
+
+
+class BulkPageChooserBlock(BulkChooserMixin, PageChooserBlock):
+    """Page chooser block the list blocks can validate in bulk."""
+
+
+class BulkImageChooserBlock(BulkChooserMixin, ImageChooserBlock):
+    """Image chooser block the list blocks can validate in bulk."""
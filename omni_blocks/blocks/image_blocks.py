@@ -2,23 +2,45 @@ from __future__ import unicode_literals
 
 from wagtail.core.blocks import StructBlock
 from wagtail.core.blocks.list_block import ListBlock
-from wagtail.images.blocks import ImageChooserBlock
 
+from omni_blocks.blocks.chooser_blocks import BulkImageChooserBlock
+from omni_blocks.blocks.mixins import (
+    BulkChooserListMixin,
+    CachedTemplateMixin,
+    FragmentCacheMixin,
+    RenditionPrefetchMixin,
+    RenditionSpecsMixin,
+    SharedChildMixin,
+    StreamingRenderMixin,
+    get_shared_block,
+)
 from omni_blocks.blocks.struct_blocks import LinkBlock
-
-
-class ImageGridBlock(ListBlock):
+from omni_blocks.instrumentation import instrument_render
+
+
+@instrument_render
+class ImageGridBlock(
+    CachedTemplateMixin,
+    StreamingRenderMixin,
+    RenditionPrefetchMixin,
+    BulkChooserListMixin,
+    SharedChildMixin,
+    ListBlock,
+):
     """Block for displaying a grid of images."""
 
+    child_template = "blocks/image_grid_item.html"
+    rendition_specs = ("width-1400", "fill-420x420-c100")
+
     def __init__(self, **kwargs):
         """
-        Instantiates an ImageChooserBlock instance,
+        Gets the shared ImageChooserBlock instance,
         then passes it to the super class for list rendering.
 
         :param kwargs: Default keyword args
         :type kwargs: {}
         """
-        child_block = ImageChooserBlock(required=True)
+        child_block = get_shared_block(BulkImageChooserBlock, required=True)
         super(ImageGridBlock, self).__init__(child_block, **kwargs)
 
     class Meta(object):
@@ -29,10 +51,16 @@ class ImageGridBlock(ListBlock):
         template = "blocks/image_grid_block.html"
 
 
-class LinkedImageBlock(StructBlock):
+@instrument_render
+class LinkedImageBlock(
+    FragmentCacheMixin, CachedTemplateMixin, RenditionSpecsMixin, StructBlock
+):
     """Image block wrapped by a href link."""
 
-    image = ImageChooserBlock(required=True)
+    rendition_specs = ("width-1600",)
+    rendition_image_field = "image"
+
+    image = BulkImageChooserBlock(required=True)
     link = LinkBlock(required=True)
 
     class Meta(object):
@@ -41,18 +69,30 @@ class LinkedImageBlock(StructBlock):
         template = "blocks/linked_image_block.html"
 
 
-class LinkedImageGridBlock(ListBlock):
+@instrument_render
+class LinkedImageGridBlock(
+    CachedTemplateMixin,
+    StreamingRenderMixin,
+    RenditionPrefetchMixin,
+    BulkChooserListMixin,
+    SharedChildMixin,
+    ListBlock,
+):
     """Block for displaying a grid of linked images."""
 
+    child_template = "blocks/linked_image_grid_item.html"
+    rendition_specs = ("width-1600",)
+    rendition_image_field = "image"
+
     def __init__(self, **kwargs):
         """
-        Instantiates an LinkedImageBlock instances,
-        then passes them to the super class for list rendering.
+        Gets the shared LinkedImageBlock instance,
+        then passes it to the super class for list rendering.
 
         :param kwargs: Default keyword args
         :type kwargs: {}
         """
-        child_block = LinkedImageBlock(required=True)
+        child_block = get_shared_block(LinkedImageBlock, required=True)
         super(LinkedImageGridBlock, self).__init__(child_block, **kwargs)
 
     class Meta(object):
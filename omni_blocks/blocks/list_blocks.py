@@ -1,24 +1,47 @@
 from __future__ import unicode_literals
 
-from django.utils.html import format_html, format_html_join
+from django.utils.encoding import force_text
+from django.utils.html import conditional_escape
+from django.utils.safestring import mark_safe
 from wagtail.core.blocks import CharBlock
 from wagtail.core.blocks.list_block import ListBlock
 
+from omni_blocks.blocks.mixins import (
+    BulkChooserListMixin,
+    CachedTemplateMixin,
+    FragmentCacheMixin,
+    RenditionPrefetchMixin,
+    SharedChildMixin,
+    StreamingRenderMixin,
+    get_shared_block,
+)
 from omni_blocks.blocks.struct_blocks import BasicCardBlock, FlowBlock
-
-
-class BasicCardGridBlock(ListBlock):
+from omni_blocks.instrumentation import instrument_render
+
+
+@instrument_render
+class BasicCardGridBlock(
+    CachedTemplateMixin,
+    StreamingRenderMixin,
+    RenditionPrefetchMixin,
+    BulkChooserListMixin,
+    SharedChildMixin,
+    ListBlock,
+):
     """Block for displaying a grid of cards."""
 
+    rendition_specs = ("fill-480x320-c100",)
+    rendition_image_field = "image"
+
     def __init__(self, **kwargs):
         """
-        Instantiates an ImageChooserBlock instance,
+        Gets the shared BasicCardBlock instance,
         then passes it to the super class for list rendering.
 
         :param kwargs: Default keyword args
         :type kwargs: {}
         """
-        child_block = BasicCardBlock(required=True)
+        child_block = get_shared_block(BasicCardBlock, required=True)
         super(BasicCardGridBlock, self).__init__(child_block, **kwargs)
 
     class Meta(object):
@@ -29,18 +52,31 @@ class BasicCardGridBlock(ListBlock):
         template = "blocks/basic_card_grid_block.html"
 
 
-class FlowListBlock(ListBlock):
+@instrument_render
+class FlowListBlock(
+    FragmentCacheMixin,
+    CachedTemplateMixin,
+    StreamingRenderMixin,
+    RenditionPrefetchMixin,
+    BulkChooserListMixin,
+    SharedChildMixin,
+    ListBlock,
+):
     """Block for displaying lists of data points."""
 
+    child_template = "blocks/flow_list_item.html"
+    rendition_specs = ("fill-300x300-c100",)
+    rendition_image_field = "image"
+
     def __init__(self, **kwargs):
         """
-        Instantiates FlowBlock instance, then passes it to the super
+        Gets the shared FlowBlock instance, then passes it to the super
         class for list rendering.
 
         :param kwargs: Default keyword args
         :type kwargs: {}
         """
-        child_block = FlowBlock(required=True)
+        child_block = get_shared_block(FlowBlock, required=True)
         super(FlowListBlock, self).__init__(child_block, **kwargs)
 
     class Meta(object):
@@ -51,20 +87,23 @@ class FlowListBlock(ListBlock):
         template = "blocks/flow_list_block.html"
 
 
-class ULBlock(ListBlock):
+@instrument_render
+class ULBlock(SharedChildMixin, ListBlock):
     """Block for displaying an unordered of rich text."""
 
     def __init__(self, **kwargs):
         """
-        Instantiates an RichTextBlock instance,
+        Gets the shared CharBlock instance,
         then passes it to the super class for list rendering.
 
         :param kwargs: Default keyword args
         :type kwargs: {}
         """
-        child_block = CharBlock(required=True)
+        child_block = get_shared_block(CharBlock, required=True)
         super(ULBlock, self).__init__(child_block, **kwargs)
 
+    list_tag = "ul"
+
     class Meta(object):
         """Wagtail properties."""
 
@@ -72,27 +111,31 @@ class ULBlock(ListBlock):
         label = "Unordered List"
 
     def render_basic(self, value, context=None):
-        child_list = []
-        for child_value in value:
-            child_list.append((self.child_block.render(child_value, context=context),))
-
-        children = format_html_join("\n", "<li>{0}</li>", child_list)
-        return format_html('<ul class="written_content_list">{0}</ul>', children)
-
+        """
+        Render every item in a single pass, joining them with a single allocation.
 
+        The items are CharBlock values, so rendering one is escaping its text.
+        """
+        if value:
+            items = "</li>\n<li>".join(
+                [conditional_escape(force_text(item)) for item in value]
+            )
+            children = "<li>" + items + "</li>"
+        else:
+            children = ""
+        return mark_safe(
+            '<{0} class="written_content_list">{1}</{0}>'.format(self.list_tag, children)
+        )
+
+
+@instrument_render
 class OLBlock(ULBlock):
     """Block for displaying an ordered of rich text."""
 
+    list_tag = "ol"
+
     class Meta(object):
         """Wagtail properties."""
 
         icon = "list-ol"
         label = "Ordered List"
-
-    def render_basic(self, value, context=None):
-        child_list = []
-        for child_value in value:
-            child_list.append((self.child_block.render(child_value, context=context),))
-
-        children = format_html_join("\n", "<li>{0}</li>", child_list)
-        return format_html('<ol class="written_content_list">{0}</ol>', children)
@@ -0,0 +1,509 @@
+from __future__ import unicode_literals
+
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.core.exceptions import ValidationError
+from django.db.models import Model
+from django.utils.safestring import mark_safe
+from wagtail.core.models import Page
+
+from omni_blocks.fragment_cache import get_fragment_cache
+from omni_blocks.placeholders import placeholders_enabled, prefetch_placeholders
+from omni_blocks.renditions import (
+    get_image_api_representation,
+    get_rendition,
+    prefetch_renditions,
+)
+from omni_blocks.template_cache import get_block_template
+from omni_blocks.walk import walk_raw, walk_values
+
+
+_prefetched = threading.local()
+
+#: Placeholder for the children when the list template is rendered for streaming.
+CHILDREN_MARKER = "\x00omni-blocks-children\x00"
+
+_shared_blocks = {}
+_shared_blocks_lock = threading.Lock()
+
+
+def get_shared_block(block_class, **kwargs):
+    """
+    Get a block definition shared by every block asking for the same class and kwargs.
+
+    The definition is built once per process. It is shared, so it must be
+    treated as immutable: it is only meant to be the child of list blocks,
+    which never call `set_name` on their child.
+
+    :param block_class: The block class.
+    :param kwargs: The keyword args of the block, with hashable values.
+    :return: The block instance.
+    """
+    key = (block_class, tuple(sorted(kwargs.items())))
+    with _shared_blocks_lock:
+        block = _shared_blocks.get(key)
+        if block is None:
+            block = _shared_blocks[key] = block_class(**kwargs)
+        return block
+
+
+@contextmanager
+def prefetched_pages(pages):
+    """
+    Make already loaded pages available to `PagePrefetchMixin` blocks.
+
+    While the context is active, converting a block value that references one
+    of the given page ids uses the loaded page instead of querying for it.
+
+    :param pages: Dict of page id to page, or to `None` for missing pages.
+    """
+    previous = getattr(_prefetched, "pages", None)
+    merged = dict(previous or {})
+    merged.update(pages)
+    _prefetched.pages = merged
+    try:
+        yield
+    finally:
+        _prefetched.pages = previous
+
+
+def get_prefetched_pages():
+    """Get the pages made available by `prefetched_pages`, by page id."""
+    return getattr(_prefetched, "pages", None) or {}
+
+
+@contextmanager
+def prefetched_choosers(instances):
+    """
+    Make already loaded instances available to `BulkChooserMixin` blocks.
+
+    While the context is active, converting or cleaning a chooser value of one
+    of the given models uses the loaded instances instead of querying for them.
+
+    :param instances: Dict of model to a dict of pk to instance, or to `None` for
+        missing ones.
+    """
+    previous = getattr(_prefetched, "choosers", None)
+    merged = dict(previous or {})
+    for model, model_instances in instances.items():
+        merged[model] = dict(merged.get(model, {}))
+        merged[model].update(model_instances)
+    _prefetched.choosers = merged
+    try:
+        yield
+    finally:
+        _prefetched.choosers = previous
+
+
+class CachedTemplateMixin(object):
+    """
+    Mixin for blocks rendering through a template object resolved once per process.
+
+    Renders exactly like `Block.render`, without looking the template up by
+    name on every render.
+    """
+
+    def render(self, value, context=None):
+        """Render the block through its cached template object."""
+        template = self.get_template(context=context)
+        if not template:
+            return self.render_basic(value, context=context)
+
+        if context is None:
+            new_context = self.get_context(value)
+        else:
+            new_context = self.get_context(value, parent_context=dict(context))
+        return mark_safe(get_block_template(template).render(new_context))
+
+
+class FragmentCacheMixin(object):
+    """
+    Mixin for blocks whose rendered HTML can be reused between requests.
+
+    Only active when the `OMNI_BLOCKS_FRAGMENT_CACHE` setting is set. The key
+    covers the block value and the versions of the pages and images it shows,
+    so the template must not depend on anything else from the parent context.
+    """
+
+    def render(self, value, context=None):
+        """Render the block, or return the cached HTML of an identical render."""
+        fragment_cache = get_fragment_cache()
+        if fragment_cache is None or not value:
+            return super(FragmentCacheMixin, self).render(value, context=context)
+
+        key = fragment_cache.make_key(self, value, context=context)
+        html = fragment_cache.get(key)
+        if html is None:
+            html = super(FragmentCacheMixin, self).render(value, context=context)
+            fragment_cache.set(key, html)
+        return mark_safe(html)
+
+
+class BulkChooserMixin(object):
+    """
+    Mixin for chooser blocks that can use instances loaded in bulk.
+
+    Inside `prefetched_choosers`, `to_python`, `value_from_form` and `clean`
+    look the chosen pk up in the loaded instances. `clean` raises the same
+    error as the form field for missing ones.
+    """
+
+    def get_bulk_pk(self, value):
+        """
+        Get the pk of a chooser value, as stored in the database.
+
+        :param value: A model instance or a pk.
+        :return: The pk, or None if the value is empty or not a valid pk.
+        """
+        if isinstance(value, Model):
+            value = value.pk
+        if value in (None, ""):
+            return None
+        try:
+            return self.target_model._meta.pk.to_python(value)
+        except ValidationError:
+            return None
+
+    def get_prefetched_instances(self):
+        """Get the prefetched instances of our model by pk, or None."""
+        choosers = getattr(_prefetched, "choosers", None)
+        return None if choosers is None else choosers.get(self.target_model)
+
+    def to_python(self, value):
+        """Use the prefetched instance rather than querying for it."""
+        instances = self.get_prefetched_instances()
+        pk = self.get_bulk_pk(value)
+        if instances is None or pk not in instances:
+            return super(BulkChooserMixin, self).to_python(value)
+        return instances[pk]
+
+    def value_from_form(self, value):
+        """Use the prefetched instance for the posted pk rather than querying for it."""
+        collected = getattr(_prefetched, "collected", None)
+        if collected is not None:
+            # Parsing the form data to collect the chosen pks, see BulkChooserListMixin
+            collected.append((self, value))
+            return None
+
+        instances = self.get_prefetched_instances()
+        pk = self.get_bulk_pk(value)
+        if instances is None or pk not in instances:
+            return super(BulkChooserMixin, self).value_from_form(value)
+        return instances[pk]
+
+    def clean(self, value):
+        """Validate the value against the prefetched instances, if there are any."""
+        instances = self.get_prefetched_instances()
+        pk = self.get_bulk_pk(value)
+        if instances is None or pk is None:
+            return super(BulkChooserMixin, self).clean(value)
+
+        if instances.get(pk) is None:
+            raise ValidationError(
+                self.field.error_messages["invalid_choice"], code="invalid_choice"
+            )
+        return instances[pk]
+
+
+def load_chooser_instances(values):
+    """
+    Load the instances of every `BulkChooserMixin` value with one query per model.
+
+    Instances that are already prefetched are not loaded again.
+
+    :param values: Iterable of `(block, value)`, the value being an instance or a pk.
+    :return: Dict of model to a dict of pk to instance, or to `None` for missing
+        instances.
+    """
+    known = getattr(_prefetched, "choosers", None) or {}
+    known_pages = getattr(_prefetched, "pages", None) or {}
+    pks = defaultdict(set)
+    for block, value in values:
+        if isinstance(block, BulkChooserMixin):
+            model = block.target_model
+            pk = block.get_bulk_pk(value)
+            if pk is None or pk in known.get(model, ()):
+                continue
+            if issubclass(model, Page) and pk in known_pages:
+                # Already loaded for a `PagePrefetchMixin` block
+                continue
+            pks[model].add(pk)
+    instances = {}
+    for model, model_pks in pks.items():
+        instances[model] = dict.fromkeys(model_pks)
+        instances[model].update(model.objects.in_bulk(list(model_pks)))
+    return instances
+
+
+class BulkChooserListMixin(object):
+    """
+    Mixin for list blocks loading the choosers of all their children together.
+
+    Converting, cleaning or parsing the posted form data of the list loads
+    every `BulkChooserMixin` value in it with one query per model, and
+    `bulk_to_python` does the same for all the lists of a StreamField at once.
+    """
+
+    def bulk_to_python(self, values):
+        """
+        Convert several raw list values, loading their choosers together.
+
+        :param values: List of raw list values.
+        :return: List of list values, in the same order.
+        """
+        raw_values = (pair for value in values for pair in walk_raw(self, value))
+        parent = super(BulkChooserListMixin, self)
+        with prefetched_choosers(load_chooser_instances(raw_values)):
+            return [parent.to_python(value) for value in values]
+
+    def to_python(self, value):
+        """Convert the list, loading the choosers of its children together."""
+        return self.bulk_to_python([value])[0]
+
+    def clean(self, value):
+        """Clean the children against the instances loaded in bulk."""
+        with prefetched_choosers(load_chooser_instances(walk_values(self, value))):
+            return super(BulkChooserListMixin, self).clean(value)
+
+    def value_from_datadict(self, data, files, prefix):
+        """Parse the posted list, loading the choosers of its children together."""
+        parent = super(BulkChooserListMixin, self)
+        if getattr(_prefetched, "collected", None) is not None:
+            # Nested in a list that is collecting the chosen pks
+            return parent.value_from_datadict(data, files, prefix)
+
+        # The data is parsed twice, first collecting the chosen pks without queries
+        _prefetched.collected = collected = []
+        try:
+            parent.value_from_datadict(data, files, prefix)
+        finally:
+            _prefetched.collected = None
+        with prefetched_choosers(load_chooser_instances(collected)):
+            return parent.value_from_datadict(data, files, prefix)
+
+
+class SharedChildMixin(object):
+    """
+    Mixin for list blocks whose child is a definition from `get_shared_block`.
+
+    The output of `deconstruct`, which `makemigrations` and block equality
+    use, is computed once per block.
+    """
+
+    def deconstruct(self):
+        """Deconstruct the block, once."""
+        try:
+            return self._deconstructed
+        except AttributeError:
+            self._deconstructed = super(SharedChildMixin, self).deconstruct()
+            return self._deconstructed
+
+
+class RenditionSpecsMixin(object):
+    """
+    Mixin for blocks declaring the image renditions their template renders.
+
+    The specs are the registry `omni_blocks.warming` uses to generate the
+    renditions ahead of the first request.
+    """
+
+    #: Filter specs rendered by the template.
+    rendition_specs = ()
+    #: Name of the image field on a struct value, or None if the value is the image.
+    rendition_image_field = None
+
+    def get_rendition_images(self, value):
+        """
+        Get the images the renditions are rendered for.
+
+        :param value: The block value.
+        :return: List of images.
+        """
+        if not value:
+            return []
+        if self.rendition_image_field is None:
+            return [value]
+        return [value.get(self.rendition_image_field)]
+
+    def get_api_representation(self, value, context=None):
+        """Represent the image with the URLs of its renditions, rather than its id."""
+        if self.rendition_image_field is None:
+            return get_image_api_representation(value, self.rendition_specs)
+        representation = super(RenditionSpecsMixin, self).get_api_representation(
+            value, context=context
+        )
+        if value:
+            representation[self.rendition_image_field] = get_image_api_representation(
+                value.get(self.rendition_image_field), self.rendition_specs
+            )
+        return representation
+
+
+class RenditionPrefetchMixin(RenditionSpecsMixin):
+    """
+    Mixin for list blocks that render an image rendition for every child.
+
+    All renditions named in `rendition_specs` are fetched up front, so the
+    per-child `get_rendition` lookups in the template are read from memory.
+    """
+
+    #: Filter specs rendered by the template for each child.
+    rendition_specs = ()
+    #: Name of the image field on a struct child, or None if the child is the image.
+    rendition_image_field = None
+
+    def get_rendition_images(self, value):
+        """
+        Get the images of every child in the list value.
+
+        :param value: The list value.
+        :return: List of images.
+        """
+        if self.rendition_image_field is None:
+            return list(value)
+        return [child.get(self.rendition_image_field) for child in value]
+
+    def get_api_representation(self, value, context=None):
+        """Represent the images of the children with the URLs of their renditions."""
+        # `super(RenditionSpecsMixin, ...)` skips the single image representation
+        if isinstance(self.child_block, RenditionSpecsMixin):
+            # The children represent their images themselves
+            return super(RenditionSpecsMixin, self).get_api_representation(
+                value, context=context
+            )
+        if self.rendition_image_field is None:
+            return [
+                get_image_api_representation(image, self.rendition_specs)
+                for image in self.get_rendition_images(value)
+            ]
+        representation = super(RenditionSpecsMixin, self).get_api_representation(
+            value, context=context
+        )
+        for child, image in zip(representation, self.get_rendition_images(value)):
+            child[self.rendition_image_field] = get_image_api_representation(
+                image, self.rendition_specs
+            )
+        return representation
+
+    def get_context(self, value, parent_context=None):
+        """Prefetch the renditions before the template is rendered."""
+        context = super(RenditionPrefetchMixin, self).get_context(
+            value, parent_context=parent_context
+        )
+        images = [image for image in self.get_rendition_images(value) if image]
+        prefetch_renditions(images, self.rendition_specs)
+        if placeholders_enabled():
+            specs = self.rendition_specs
+            prefetch_placeholders(
+                get_rendition(image, spec) for image in images for spec in specs
+            )
+        return context
+
+
+class PagePrefetchMixin(object):
+    """
+    Mixin for struct blocks with a page chooser child.
+
+    `to_python` takes the page from `prefetched_pages` when it is available,
+    so a whole stream of these blocks can share a single page query.
+    """
+
+    #: Name of the page chooser child block.
+    prefetch_page_field = "internal_url"
+
+    def get_prefetch_page_id(self, value):
+        """
+        Get the page id from a raw (JSON) block value.
+
+        :param value: The raw block value.
+        :return: The page id, or None.
+        """
+        if not value:
+            return None
+        return value.get(self.prefetch_page_field)
+
+    def to_python(self, value):
+        """Use the prefetched page rather than querying for it."""
+        pages = getattr(_prefetched, "pages", None)
+        page_id = self.get_prefetch_page_id(value)
+        if pages is None or page_id not in pages:
+            return super(PagePrefetchMixin, self).to_python(value)
+
+        value = dict(value)
+        del value[self.prefetch_page_field]
+        struct_value = super(PagePrefetchMixin, self).to_python(value)
+        struct_value[self.prefetch_page_field] = pages[page_id]
+        return struct_value
+
+
+class StreamingRenderMixin(object):
+    """
+    Mixin for list blocks that can render their children one at a time.
+
+    The list template only renders the markup around the children, through the
+    `children` context variable. `render` joins the children into it, while
+    `render_stream` yields the markup and then each child as a separate chunk.
+    """
+
+    #: Template for a single child, or None to render the child block itself.
+    child_template = None
+
+    def render_child(self, child_value, context=None):
+        """
+        Render a single child of the list.
+
+        :param child_value: The value of the child.
+        :param context: The context of the list.
+        :return: The rendered child.
+        """
+        if not self.child_template:
+            return self.child_block.render(child_value, context=context)
+        child_context = self.child_block.get_context(
+            child_value, parent_context=dict(context or {})
+        )
+        return mark_safe(get_block_template(self.child_template).render(child_context))
+
+    def get_context(self, value, parent_context=None):
+        """Add the rendered children into our context."""
+        context = super(StreamingRenderMixin, self).get_context(
+            value, parent_context=parent_context
+        )
+        context["children"] = mark_safe(
+            "".join(self.render_child(child_value, context) for child_value in value)
+        )
+        return context
+
+    def render_stream(self, value, context=None):
+        """
+        Render the block as a generator of HTML chunks, one per child.
+
+        Only a single child is held in memory at a time, so the generator can be
+        handed to `StreamingHttpResponse` for very large lists.
+
+        :param value: The list value.
+        :param context: The parent context.
+        """
+        template = self.get_template(context=context)
+        if not template:
+            yield self.render(value, context=context)
+            return
+
+        parent_context = None if context is None else dict(context)
+        new_context = super(StreamingRenderMixin, self).get_context(
+            value, parent_context=parent_context
+        )
+        new_context["children"] = mark_safe(CHILDREN_MARKER)
+        before, marker, after = (
+            get_block_template(template).render(new_context).partition(CHILDREN_MARKER)
+        )
+        if not marker:
+            # The template does not render `children`, so it cannot be split
+            yield self.render(value, context=context)
+            return
+
+        yield mark_safe(before)
+        for child_value in value:
+            yield self.render_child(child_value, new_context)
+        yield mark_safe(after)
@@ -1,22 +1,34 @@
 from __future__ import unicode_literals
 
 from django.core.exceptions import ValidationError
+from django.utils.html import conditional_escape
+from django.utils.safestring import mark_safe
 from django.utils.translation import gettext_lazy as _
 from wagtail.core import blocks
 from wagtail.core.blocks.field_block import URLBlock
-from wagtail.images.blocks import ImageChooserBlock
 
+from omni_blocks.assets import GOOGLE_MAPS, get_request_assets
+from omni_blocks.blocks.chooser_blocks import BulkImageChooserBlock, BulkPageChooserBlock
+from omni_blocks.blocks.mixins import (
+    CachedTemplateMixin,
+    FragmentCacheMixin,
+    PagePrefetchMixin,
+    RenditionSpecsMixin,
+)
 from omni_blocks.blocks.text_blocks import HBlock
+from omni_blocks.instrumentation import instrument_render
+from omni_blocks.page_urls import get_page_url
 
 
-class LinkBlock(blocks.StructBlock):
+@instrument_render
+class LinkBlock(PagePrefetchMixin, blocks.StructBlock):
     """Block for adding links.
 
     If required is set to false, we assume that a link does not need to be present.
     """
 
     external_url = URLBlock(required=False)
-    internal_url = blocks.PageChooserBlock(icon="doc-empty-inverse", required=False)
+    internal_url = BulkPageChooserBlock(icon="doc-empty-inverse", required=False)
 
     both_urls_error = _("Please select either internal URL or external URL; not both.")
     no_urls_error = _("Please select an internal URL or add an external URL.")
@@ -58,19 +70,53 @@ class LinkBlock(blocks.StructBlock):
 
         return cleaned_data
 
+    def get_url(self, value, request=None):
+        """
+        Get the URL of the link, preferring the external URL over the internal page.
+
+        :param value: The link value.
+        :param request: The current request, the page URLs are computed once per request.
+        :return: The URL, or an empty string.
+        """
+        if not value:
+            return ""
+        if value.get("external_url"):
+            return value["external_url"]
+        return get_page_url(value.get("internal_url"), request=request)
+
+    def get_api_representation(self, value, context=None):
+        """Add the resolved URL of the link to its representation."""
+        representation = super(LinkBlock, self).get_api_representation(
+            value, context=context
+        )
+        request = (context or {}).get("request")
+        representation["url"] = self.get_url(value, request=request)
+        return representation
+
+    def render_basic(self, value, context=None):
+        """Render the escaped URL without going through the template engine."""
+        request = (context or {}).get("request")
+        return conditional_escape(self.get_url(value, request=request))
+
     def render(self, value, context=None):
-        """Override the render to get around the above dunder string issue."""
+        """Override the render to strip the whitespace left by an opt-in template.
+
+        Without a template, e.g. `LinkBlock(template="blocks/link_block.html")`,
+        this goes straight to `render_basic`.
+        """
+        if not self.get_template(context=context):
+            return self.render_basic(value, context=context)
         rendered = super(LinkBlock, self).render(value, context=context)
-        return rendered.strip()
+        return mark_safe(rendered.strip())
 
     class Meta:
         """Wagtail properties."""
 
         label = "Link"
-        template = "blocks/link_block.html"
 
 
-class TitledLinkBlock(blocks.StructBlock):
+@instrument_render
+class TitledLinkBlock(CachedTemplateMixin, blocks.StructBlock):
     """Link block with a title."""
 
     title = blocks.CharBlock(required=True)
@@ -84,11 +130,17 @@ class TitledLinkBlock(blocks.StructBlock):
         template = "blocks/titled_link_block.html"
 
 
-class BasicCardBlock(blocks.StructBlock):
+@instrument_render
+class BasicCardBlock(
+    FragmentCacheMixin, CachedTemplateMixin, RenditionSpecsMixin, blocks.StructBlock
+):
     """A basic card block."""
 
+    rendition_specs = ("fill-480x320-c100",)
+    rendition_image_field = "image"
+
     title = HBlock(tag="h2")
-    image = ImageChooserBlock(required=False)
+    image = BulkImageChooserBlock(required=False)
     link = LinkBlock(required=False)
     description = blocks.TextBlock(required=False)
 
@@ -100,10 +152,14 @@ class BasicCardBlock(blocks.StructBlock):
         label = "Basic card"
 
 
-class ColumnBlock(blocks.StructBlock):
+@instrument_render
+class ColumnBlock(CachedTemplateMixin, RenditionSpecsMixin, blocks.StructBlock):
     """Block that can either contain text or an image."""
 
-    image = ImageChooserBlock(required=False)
+    rendition_specs = ("width-800",)
+    rendition_image_field = "image"
+
+    image = BulkImageChooserBlock(required=False)
     paragraph = blocks.RichTextBlock(required=False)
 
     both_fields_error = _("Please add either an image or a paragraph.")
@@ -125,7 +181,13 @@ class ColumnBlock(blocks.StructBlock):
 
         return cleaned_data
 
+    class Meta(object):
+        """Wagtail properties."""
+
+        template = "blocks/column_block.html"
+
 
+@instrument_render
 class ButtonBlock(TitledLinkBlock):
     class Meta(object):
         """Wagtail properties."""
@@ -135,23 +197,41 @@ class ButtonBlock(TitledLinkBlock):
         template = "blocks/button_block.html"
 
 
+@instrument_render
 class FlowBlock(blocks.StructBlock):
     """Block for displaying flow or timeline data."""
 
     meta_title = blocks.CharBlock(required=True)
     title = blocks.CharBlock(required=False)
     body = blocks.RichTextBlock(required=False)
-    image = ImageChooserBlock(required=False)
+    image = BulkImageChooserBlock(required=False)
     link = LinkBlock(required=False)
 
 
-class GoogleMapBlock(blocks.StructBlock):
+@instrument_render
+class GoogleMapBlock(CachedTemplateMixin, blocks.StructBlock):
     """Block for embedding a google map."""
 
     longitude = blocks.CharBlock(required=True, max_length=255)
     latitude = blocks.CharBlock(required=True, max_length=255)
     zoom_level = blocks.CharBlock(default=14, required=True, max_length=3)
 
+    # The maps script is only output once per request, so can't be prerendered
+    prerender = False
+
+    def get_context(self, value, parent_context=None):
+        """Add whether the maps script still needs to be output into our context."""
+        context = super(GoogleMapBlock, self).get_context(
+            value, parent_context=parent_context
+        )
+        request = context.get("request")
+        if request is None:
+            context["include_maps_script"] = True
+        else:
+            assets = get_request_assets(request)
+            context["include_maps_script"] = assets.include(GOOGLE_MAPS)
+        return context
+
     class Meta(object):
         """
         Wagtail properties
@@ -162,7 +242,8 @@ class GoogleMapBlock(blocks.StructBlock):
         label = "Google Map"
 
 
-class TwoColumnBlock(blocks.StructBlock):
+@instrument_render
+class TwoColumnBlock(FragmentCacheMixin, CachedTemplateMixin, blocks.StructBlock):
     """Two column block."""
 
     left_column = ColumnBlock(required=True)
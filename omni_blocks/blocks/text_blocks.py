@@ -1,11 +1,15 @@
 from __future__ import unicode_literals
 
 from django.utils.safestring import mark_safe
-from django.utils.text import slugify
 from wagtail.core.blocks import BlockQuoteBlock, CharBlock
 
+from omni_blocks.anchors import cached_slugify, get_request_anchors
+from omni_blocks.blocks.mixins import CachedTemplateMixin
+from omni_blocks.instrumentation import instrument_render
 
-class HBlock(CharBlock):
+
+@instrument_render
+class HBlock(CachedTemplateMixin, CharBlock):
     """A block for displaying headings, with ID for use in anchors."""
     def __init__(
         self,
@@ -18,6 +22,8 @@ class HBlock(CharBlock):
     ):
         self.tag = tag
         self.slugified_id = slugified_id
+        # Slugified ids are kept unique within the request, so can't be prerendered
+        self.prerender = not slugified_id
         super(HBlock, self).__init__(
             icon=icon,
             classname=classname,
@@ -33,7 +39,12 @@ class HBlock(CharBlock):
         )
         context['tag'] = self.tag
         if self.slugified_id:
-            context['slugified_id'] = slugify(value)
+            slug = cached_slugify(value)
+            request = context.get('request')
+            if request is not None:
+                # Keep the id unique among the other headings of the page
+                slug = get_request_anchors(request).allocate(slug)
+            context['slugified_id'] = slug
         return context
 
     class Meta:
@@ -41,10 +52,13 @@ class HBlock(CharBlock):
 
 
 
-class JumpHBlock(CharBlock):
+@instrument_render
+class JumpHBlock(CachedTemplateMixin, CharBlock):
     """Special type of heading for adding jumplinks to a page."""
 
     ANCHOR_PREFIX = "heading"
+    # Anchors are kept unique within the request, so can't be prerendered
+    prerender = False
 
     def __init__(self, tag, icon="title", classname="title", *args, **kwargs):
         """Load the tag into self."""
@@ -54,13 +68,27 @@ class JumpHBlock(CharBlock):
     @staticmethod
     def make_jump_link(value):
         """Create a jumpable link."""
-        return "{0}-{1}".format(JumpHBlock.ANCHOR_PREFIX, slugify(value))
+        return "{0}-{1}".format(JumpHBlock.ANCHOR_PREFIX, cached_slugify(value))
+
+    def get_anchor(self, value, request=None):
+        """Get the anchor for a heading, unique within the request's page.
+
+        Headings indexed by a jumplist carry the anchor of their link, so they
+        render it however many times they are rendered, with or without a request.
+        """
+        anchor = getattr(value, "anchor", None)
+        if anchor is not None:
+            return anchor
+        anchor = self.make_jump_link(value)
+        if request is None:
+            return anchor
+        return get_request_anchors(request).allocate(anchor)
 
     def get_context(self, value, parent_context=None):
         """Add the tag and anchor into our context."""
         context = super(JumpHBlock, self).get_context(value, parent_context=parent_context)
         context["tag"] = self.tag
-        context["anchor"] = self.make_jump_link(value)
+        context["anchor"] = self.get_anchor(value, request=context.get("request"))
         return context
 
     class Meta:
@@ -68,7 +96,8 @@ class JumpHBlock(CharBlock):
         name = "Jump H2"
 
 
-class PullQuoteBlock(CharBlock):
+@instrument_render
+class PullQuoteBlock(CachedTemplateMixin, CharBlock):
     """ Blockquote with additional css class """
 
     class Meta(object):
@@ -80,7 +109,8 @@ class PullQuoteBlock(CharBlock):
         template = "blocks/pull_quote_block.html"
 
 
-class QuoteBlock(BlockQuoteBlock):
+@instrument_render
+class QuoteBlock(CachedTemplateMixin, BlockQuoteBlock):
     """ BlockQuote with external template """
 
     class Meta(object):
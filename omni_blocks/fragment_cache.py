@@ -0,0 +1,323 @@
+from __future__ import unicode_literals
+
+import hashlib
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.signals import setting_changed
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from wagtail.core.blocks import StreamValue
+from wagtail.core.models import Page
+from wagtail.core.rich_text import RichText
+from wagtail.core.rich_text.rewriters import FIND_A_TAG, FIND_EMBED_TAG, extract_attrs
+from wagtail.core.signals import page_published, page_unpublished
+from wagtail.images import get_image_model
+from wagtail.images.models import AbstractImage
+
+from omni_blocks.page_urls import get_moved_descendant_ids, remember_url_path
+
+
+KEY_PREFIX = "omni_blocks:fragment:"
+VERSION_KEY_PREFIX = "omni_blocks:version:"
+
+#: Seconds the in-process fragments are kept without a shared cache backend,
+#: unless the `TIMEOUT` setting is given.
+LRU_TIMEOUT = 300
+
+_lock = threading.Lock()
+_fragment_cache = None
+
+
+class LRUCache(object):
+    """
+    A small thread safe, in-process least recently used cache.
+
+    :param max_size: Maximum number of values kept, 0 to disable.
+    :param timeout: Seconds the values are kept, or None to keep them until evicted.
+    """
+
+    def __init__(self, max_size, timeout=None):
+        self.max_size = max_size
+        self.timeout = timeout
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Get a value, or None if it is not cached or has expired."""
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return None
+            expires, value = self._data[key]
+            if expires is not None and expires <= time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key, value):
+        """Cache a value, evicting the least recently used one when full."""
+        if self.max_size <= 0:
+            return
+        expires = None
+        if self.timeout is not None:
+            expires = time.monotonic() + self.timeout
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        """Forget every cached value."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class FragmentCache(object):
+    """
+    Two tier cache of rendered block HTML.
+
+    Entries are looked up in an in-process LRU first, then in a shared Django
+    cache backend. Keys include a version token for every page and image the
+    block references, so bumping a version invalidates every fragment that
+    shows it. The version tokens live in the shared backend when there is one,
+    so a save in one process invalidates the fragments of all of them.
+
+    Without a shared backend the version tokens only live in the process that
+    saved the page or image, so the in-process fragments expire after `timeout`
+    seconds (`LRU_TIMEOUT` by default) for the other processes to catch up.
+
+    :param cache_alias: Alias of the Django cache backend, or None for in-process only.
+    :param lru_size: Maximum number of fragments kept in-process, 0 to disable.
+    :param timeout: Timeout of the fragments in the Django cache backend, or of the
+        in-process fragments without one.
+    """
+
+    def __init__(self, cache_alias=None, lru_size=1024, timeout=DEFAULT_TIMEOUT):
+        self.cache = caches[cache_alias] if cache_alias else None
+        lru_timeout = None
+        if self.cache is None:
+            lru_timeout = LRU_TIMEOUT if timeout is DEFAULT_TIMEOUT else timeout
+        self.lru = LRUCache(lru_size, timeout=lru_timeout)
+        self.timeout = timeout
+        self._versions = {}
+        self._versions_lock = threading.Lock()
+
+    @staticmethod
+    def version_key(label, pk):
+        return "{}{}:{}".format(VERSION_KEY_PREFIX, label, pk)
+
+    def get_versions(self, references):
+        """
+        Get the version tokens of the referenced objects.
+
+        Objects without a version are given a new one, so a version evicted from
+        the cache backend can never bring back fragments rendered before a save.
+
+        :param references: Sorted list of (model label, pk) tuples.
+        :return: List of version tokens, in the same order.
+        """
+        keys = [self.version_key(label, pk) for label, pk in references]
+        if self.cache is None:
+            with self._versions_lock:
+                return [self._versions.setdefault(key, uuid.uuid4().hex) for key in keys]
+
+        versions = self.cache.get_many(keys)
+        for key in keys:
+            if key not in versions:
+                self.cache.add(key, uuid.uuid4().hex, timeout=None)
+                versions[key] = self.cache.get(key)
+        return [versions[key] for key in keys]
+
+    def bump(self, label, pk):
+        """
+        Give an object a new version, invalidating every fragment that references it.
+
+        :param label: The model label, e.g. "wagtailcore.page".
+        :param pk: The primary key of the object.
+        """
+        self.bump_many(label, [pk])
+
+    def bump_many(self, label, pks):
+        """
+        Give several objects of a model new versions, see `bump`.
+
+        :param label: The model label, e.g. "wagtailcore.page".
+        :param pks: The primary keys of the objects.
+        """
+        versions = {self.version_key(label, pk): uuid.uuid4().hex for pk in pks}
+        if self.cache is None:
+            with self._versions_lock:
+                self._versions.update(versions)
+        elif versions:
+            self.cache.set_many(versions, timeout=None)
+
+    def make_key(self, block, value, context=None):
+        """
+        Build the cache key of a block render.
+
+        :param block: The block definition.
+        :param value: The native value of the block.
+        :param context: The parent context of the render.
+        :return: The cache key.
+        """
+        references = sorted(set(iter_references(value)))
+        request = (context or {}).get("request")
+        site = getattr(request, "site", None)
+        parts = [
+            "{}.{}".format(type(block).__module__, type(block).__name__),
+            block.get_template(context=context),
+            block.get_prep_value(value),
+            references,
+            self.get_versions(references),
+            site.pk if site is not None else None,
+        ]
+        data = json.dumps(parts, cls=DjangoJSONEncoder, sort_keys=True)
+        return KEY_PREFIX + hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """Get a rendered fragment from the first tier that has it, or None."""
+        html = self.lru.get(key)
+        if html is None and self.cache is not None:
+            html = self.cache.get(key)
+            if html is not None:
+                self.lru.set(key, html)
+        return html
+
+    def set(self, key, html):
+        """Store a rendered fragment in every tier."""
+        html = str(html)
+        self.lru.set(key, html)
+        if self.cache is not None:
+            self.cache.set(key, html, timeout=self.timeout)
+
+
+def get_fragment_cache():
+    """
+    Get the fragment cache configured by the `OMNI_BLOCKS_FRAGMENT_CACHE` setting.
+
+    The cache is opt-in: without the setting this returns None. The setting is a
+    dict with the optional keys `CACHE` (a Django cache alias for the shared
+    tier), `LRU_SIZE` (the size of the in-process tier) and `TIMEOUT`, in
+    seconds, of the shared tier, or of the in-process tier without `CACHE`.
+
+    :return: A FragmentCache, or None when fragment caching is disabled.
+    """
+    global _fragment_cache
+    config = getattr(settings, "OMNI_BLOCKS_FRAGMENT_CACHE", None)
+    if config is None or config is False:
+        return None
+
+    with _lock:
+        if _fragment_cache is None:
+            config = {} if config is True else config
+            _fragment_cache = FragmentCache(
+                cache_alias=config.get("CACHE"),
+                lru_size=config.get("LRU_SIZE", 1024),
+                timeout=config.get("TIMEOUT", DEFAULT_TIMEOUT),
+            )
+        return _fragment_cache
+
+
+def iter_rich_text_references(source):
+    """
+    Yield `(model label, pk)` for the page links and embedded images of rich text.
+
+    :param source: The rich text, in its database format.
+    """
+    for match in FIND_A_TAG.finditer(source):
+        attrs = extract_attrs(match.group(1))
+        if attrs.get("linktype") == "page" and attrs.get("id", "").isdigit():
+            yield Page._meta.label_lower, int(attrs["id"])
+    image_label = None
+    for match in FIND_EMBED_TAG.finditer(source):
+        attrs = extract_attrs(match.group(1))
+        if attrs.get("embedtype") == "image" and attrs.get("id", "").isdigit():
+            if image_label is None:
+                image_label = get_image_model()._meta.label_lower
+            yield image_label, int(attrs["id"])
+
+
+def iter_references(value):
+    """
+    Yield `(model label, pk)` for every page and image within a block value.
+
+    Pages are all labelled as `wagtailcore.page`, whatever their specific type.
+    Rich text yields the pages it links to and the images it embeds.
+
+    :param value: The native value of a block.
+    """
+    if isinstance(value, Page):
+        yield Page._meta.label_lower, value.pk
+    elif isinstance(value, AbstractImage):
+        yield value._meta.label_lower, value.pk
+    elif isinstance(value, RichText):
+        for reference in iter_rich_text_references(value.source or ""):
+            yield reference
+    elif isinstance(value, dict):
+        for child_value in value.values():
+            for reference in iter_references(child_value):
+                yield reference
+    elif isinstance(value, StreamValue):
+        for child in value:
+            for reference in iter_references(child.value):
+                yield reference
+    elif isinstance(value, (list, tuple)):
+        for child_value in value:
+            for reference in iter_references(child_value):
+                yield reference
+
+
+@receiver(pre_save)
+def remember_page_url_path(sender, instance, update_fields=None, **kwargs):
+    """Remember the URL path of a page before it is saved, to spot renames and moves."""
+    if isinstance(instance, Page) and get_fragment_cache() is not None:
+        remember_url_path(instance, update_fields=update_fields)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+@receiver(page_published)
+@receiver(page_unpublished)
+def invalidate_fragments(sender, instance, **kwargs):
+    """
+    Invalidate the fragments referencing a page or image that has changed.
+
+    Renaming or moving a page also invalidates the fragments referencing its
+    descendants, as their URLs have changed with it.
+    """
+    if isinstance(instance, Page):
+        label = Page._meta.label_lower
+    elif isinstance(instance, AbstractImage):
+        label = instance._meta.label_lower
+    else:
+        return
+
+    fragment_cache = get_fragment_cache()
+    if fragment_cache is None or instance.pk is None:
+        return
+    pks = [instance.pk]
+    if isinstance(instance, Page) and kwargs.get("signal") is post_save:
+        pks.extend(get_moved_descendant_ids(instance))
+    fragment_cache.bump_many(label, pks)
+
+
+@receiver(setting_changed)
+def reset_fragment_cache(setting, **kwargs):
+    """Rebuild the fragment cache when its settings change."""
+    global _fragment_cache
+    if setting in ("OMNI_BLOCKS_FRAGMENT_CACHE", "CACHES"):
+        with _lock:
+            _fragment_cache = None
@@ -0,0 +1,150 @@
+from __future__ import unicode_literals
+
+import functools
+import threading
+import time
+from collections import OrderedDict
+from contextlib import ExitStack, contextmanager
+
+from django.db import connections
+from django.template.engine import Engine
+
+from omni_blocks.signals import block_rendered
+
+
+_state = threading.local()
+_patch_lock = threading.Lock()
+_patch_count = 0
+_find_template = Engine.find_template
+
+PATH_SEPARATOR = " > "
+
+
+class RenderRecorder(object):
+    """
+    Collects render statistics for each block type and nesting path.
+
+    Each entry of `by_path` and `by_block` holds the number of renders and the
+    total duration (in seconds), queries and template loads of those renders,
+    including the blocks nested within them.
+    """
+
+    def __init__(self):
+        self.by_path = OrderedDict()
+        self.by_block = OrderedDict()
+        self.queries = 0
+        self.template_loads = 0
+        self._stack = []
+
+    def count_query(self, execute, sql, params, many, context):
+        """Database execute wrapper counting every query run while recording."""
+        self.queries += 1
+        return execute(sql, params, many, context)
+
+    def record(self, block, render, value, context):
+        """Render a block, recording its duration, queries and template loads."""
+        name = type(block).__name__
+        self._stack.append(name)
+        path = PATH_SEPARATOR.join(self._stack)
+        queries, template_loads = self.queries, self.template_loads
+        start = time.perf_counter()
+        try:
+            return render(block, value, context=context)
+        finally:
+            duration = time.perf_counter() - start
+            self._stack.pop()
+            queries = self.queries - queries
+            template_loads = self.template_loads - template_loads
+            for stats, key in ((self.by_path, path), (self.by_block, name)):
+                self._add(stats, key, duration, queries, template_loads)
+            block_rendered.send(
+                sender=type(block),
+                block=block,
+                path=path,
+                duration=duration,
+                queries=queries,
+                template_loads=template_loads,
+            )
+
+    @staticmethod
+    def _add(stats, key, duration, queries, template_loads):
+        entry = stats.setdefault(
+            key, {"count": 0, "duration": 0.0, "queries": 0, "template_loads": 0}
+        )
+        entry["count"] += 1
+        entry["duration"] += duration
+        entry["queries"] += queries
+        entry["template_loads"] += template_loads
+
+
+def instrument_render(block_class):
+    """
+    Class decorator recording the block's renders while `record_renders` is active.
+
+    When nothing is recording, the only cost is a thread-local lookup.
+    """
+    render = block_class.render
+    if getattr(render, "instrumented", False):
+        return block_class
+
+    @functools.wraps(render)
+    def instrumented_render(self, value, context=None):
+        recorder = getattr(_state, "recorder", None)
+        if recorder is None:
+            return render(self, value, context=context)
+        return recorder.record(self, render, value, context)
+
+    instrumented_render.instrumented = True
+    block_class.render = instrumented_render
+    return block_class
+
+
+def _counting_find_template(self, name, dirs=None, skip=None):
+    recorder = getattr(_state, "recorder", None)
+    if recorder is not None:
+        recorder.template_loads += 1
+    return _find_template(self, name, dirs=dirs, skip=skip)
+
+
+def _patch_template_loading():
+    global _patch_count
+    with _patch_lock:
+        if not _patch_count:
+            Engine.find_template = _counting_find_template
+        _patch_count += 1
+
+
+def _unpatch_template_loading():
+    global _patch_count
+    with _patch_lock:
+        _patch_count -= 1
+        if not _patch_count:
+            Engine.find_template = _find_template
+
+
+@contextmanager
+def record_renders():
+    """
+    Record the renders of omni_blocks blocks in the current thread.
+
+    Usage::
+
+        with record_renders() as recorder:
+            html = page.body.render_as_block()
+        recorder.by_path["BasicCardGridBlock > BasicCardBlock > LinkBlock"]
+
+    The `block_rendered` signal is also sent for every render, so sampled
+    requests can be reported without holding on to the recorder.
+    """
+    recorder = RenderRecorder()
+    previous = getattr(_state, "recorder", None)
+    _state.recorder = recorder
+    _patch_template_loading()
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder.count_query))
+            yield recorder
+    finally:
+        _unpatch_template_loading()
+        _state.recorder = previous
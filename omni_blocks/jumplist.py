@@ -0,0 +1,118 @@
+from __future__ import unicode_literals
+
+from collections import namedtuple
+
+from wagtail.core.blocks import StreamValue
+
+from omni_blocks.anchors import AnchorAllocator, get_request_anchors
+from omni_blocks.blocks.text_blocks import JumpHBlock
+
+
+Anchor = namedtuple("Anchor", ["value", "href"])
+
+REQUEST_ATTR = "_omni_blocks_jumplists"
+STREAM_VALUE_ATTR = "_omni_blocks_jumplist"
+
+
+class JumplistHeading(str):
+    """
+    The text of a JumpHBlock, carrying the anchor allocated for it by its jumplist.
+
+    Wagtail renders a StreamField child from its value alone, so the anchor is
+    kept on the value for the heading to render the id its jumplist link targets.
+    """
+
+    def __new__(cls, value, anchor):
+        heading = super(JumplistHeading, cls).__new__(cls, value)
+        heading.anchor = anchor
+        return heading
+
+    def __getnewargs__(self):
+        return str(self), self.anchor
+
+
+class JumplistIndex(object):
+    """The JumpHBlocks of a streamfield and their anchors, built in a single walk."""
+
+    def __init__(self, body):
+        """
+        Walk the streamfield once, allocating a unique anchor for each heading.
+
+        The anchors are stored by the id of their child, or its position when
+        it has none, and given to the headings to render, see `JumplistHeading`.
+
+        :param body: A streamfield that may contain one or more JumpHBlock.
+        """
+        allocator = AnchorAllocator()
+        self.anchors = []
+        self.anchor_ids = {}
+        for position, item in enumerate(body):
+            if isinstance(item.block, JumpHBlock):
+                base = item.block.make_jump_link(item.value)
+                anchor_id = allocator.allocate(base)
+                self.anchor_ids[getattr(item, "id", None) or position] = anchor_id
+                item.value = JumplistHeading(item.value, anchor_id)
+                href = "#{}".format(anchor_id)
+                self.anchors.append(Anchor(value=item.value, href=href))
+
+    @property
+    def has_jumplist(self):
+        """Whether the streamfield contains one or more JumpHBlock."""
+        return bool(self.anchors)
+
+    def __bool__(self):
+        return self.has_jumplist
+
+    def __iter__(self):
+        return iter(self.anchors)
+
+    def __len__(self):
+        return len(self.anchors)
+
+
+def get_stream_jumplist_index(body):
+    """
+    Get the jumplist index of a streamfield, built once per StreamValue.
+
+    :param body: A streamfield that may contain one or more JumpHBlock.
+    :return: JumplistIndex
+    """
+    if not isinstance(body, StreamValue):
+        return JumplistIndex(body)
+
+    index = getattr(body, STREAM_VALUE_ATTR, None)
+    if index is None:
+        index = JumplistIndex(body)
+        setattr(body, STREAM_VALUE_ATTR, index)
+    return index
+
+
+def get_jumplist_index(calling_page, field, request=None):
+    """
+    Get the jumplist index of a page's streamfield, built once per request.
+
+    The anchors are also reserved on the request, so the other headings
+    rendered during the same request don't take them.
+
+    :param calling_page: The Page object that contains a streamfield.
+    :param field: The name of the streamfield.
+    :param request: The current request, if any.
+    :return: JumplistIndex
+    """
+    body = getattr(calling_page, field, [])
+    if request is None:
+        return get_stream_jumplist_index(body)
+
+    indexes = getattr(request, REQUEST_ATTR, None)
+    if indexes is None:
+        indexes = {}
+        setattr(request, REQUEST_ATTR, indexes)
+
+    key = (calling_page.pk, field)
+    if key not in indexes:
+        index = get_stream_jumplist_index(body)
+        allocator = get_request_anchors(request)
+        for anchor_id in index.anchor_ids.values():
+            allocator.reserve(anchor_id)
+        indexes[key] = index
+    return indexes[key]
@@ -0,0 +1,79 @@
+from __future__ import unicode_literals
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import partial
+
+from django.core.management.base import BaseCommand
+from wagtail.core.models import Page
+
+from omni_blocks import warming
+
+
+def map_bounded(executor, function, items, window):
+    """
+    Yield the results of a function over items run in an executor, as they complete.
+
+    At most `window` items are submitted at a time, so neither the pending calls
+    nor their results pile up in memory.
+
+    :param executor: A `concurrent.futures.Executor`.
+    :param function: The function to call with each item.
+    :param items: Iterable of items, consumed as calls complete.
+    :param window: The number of calls submitted at a time.
+    """
+    pending = set()
+    for item in items:
+        pending.add(executor.submit(function, item))
+        if len(pending) >= window:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+    for future in wait(pending).done:
+        yield future.result()
+
+
+def count_renditions(result):
+    """Count the renditions warmed, from the dict of image to filter specs returned."""
+    return sum(len(specs) for specs in result.values())
+
+
+class Command(BaseCommand):
+    help = "Generate the image renditions shown by the omni_blocks blocks of every page."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=warming.get_rendition_workers(),
+            help="Number of pages to warm in parallel, 1 to warm them one at a time.",
+        )
+        parser.add_argument("--live", action="store_true", help="Only warm live pages.")
+
+    def handle(self, *args, **options):
+        pages = Page.objects.filter(content_type__in=warming.get_stream_page_types())
+        if options["live"]:
+            pages = pages.live()
+        page_ids = pages.values_list("pk", flat=True).iterator()
+        page_count = rendition_count = 0
+
+        if options["workers"] > 1:
+            executor = ThreadPoolExecutor(max_workers=options["workers"])
+            with executor:
+                warm = partial(warming.run_in_worker, warming.warm_page_renditions)
+                for result in map_bounded(
+                    executor, warm, page_ids, window=options["workers"] * 2
+                ):
+                    page_count += 1
+                    rendition_count += count_renditions(result)
+        else:
+            for page_id in page_ids:
+                # The main thread keeps using its connection, so it isn't closed
+                result = warming.run_in_worker(
+                    warming.warm_page_renditions, page_id, close_connection=False
+                )
+                page_count += 1
+                rendition_count += count_renditions(result)
+
+        self.stdout.write(
+            "Warmed {} renditions across {} pages.".format(rendition_count, page_count)
+        )
@@ -0,0 +1,25 @@
+from __future__ import unicode_literals
+
+from django.core.management.base import BaseCommand
+
+from omni_blocks import usage
+
+
+class Command(BaseCommand):
+    help = "Report how often each omni_blocks block is used, and how big they get."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--live", action="store_true", help="Only scan live pages.")
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=2000,
+            help="Number of pages fetched from the database at a time.",
+        )
+
+    def handle(self, *args, **options):
+        block_usage = usage.scan_usage(
+            live=options["live"], chunk_size=options["chunk_size"]
+        )
+        for line in block_usage.report():
+            self.stdout.write(line)
@@ -0,0 +1,22 @@
+from __future__ import unicode_literals
+
+from django.core.management.base import BaseCommand
+from wagtail.core.models import Page
+
+from omni_blocks import references, warming
+
+
+class Command(BaseCommand):
+    help = "Index the pages and images chosen in the omni_blocks blocks of every page."
+
+    def handle(self, *args, **options):
+        pages = Page.objects.filter(content_type__in=warming.get_stream_page_types())
+        page_count = reference_count = 0
+        for page_id in pages.values_list("pk", flat=True).iterator():
+            page = Page.objects.get(pk=page_id).specific
+            reference_count += len(references.index_page(page))
+            page_count += 1
+
+        self.stdout.write(
+            "Indexed {} references across {} pages.".format(reference_count, page_count)
+        )
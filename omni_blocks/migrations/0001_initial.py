@@ -0,0 +1,47 @@
+# Generated by Django 2.1.15 on 2026-10-18 10:20
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('wagtailcore', '0040_page_draft_title'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PrerenderedBlock',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field_name', models.CharField(max_length=255)),
+                ('position', models.PositiveIntegerField()),
+                ('block_type', models.CharField(max_length=255)),
+                ('value_hash', models.CharField(max_length=40)),
+                ('html', models.TextField()),
+                ('stale', models.BooleanField(default=False)),
+                ('rendered_at', models.DateTimeField(auto_now_add=True)),
+                ('revision', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='wagtailcore.PageRevision')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PrerenderedReference',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('label', models.CharField(max_length=100)),
+                ('object_id', models.CharField(max_length=255)),
+                ('block', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='references', to='omni_blocks.PrerenderedBlock')),
+            ],
+        ),
+        migrations.AlterIndexTogether(
+            name='prerenderedreference',
+            index_together={('label', 'object_id')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='prerenderedblock',
+            unique_together={('revision', 'field_name', 'position')},
+        ),
+    ]
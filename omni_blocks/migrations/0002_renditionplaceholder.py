@@ -0,0 +1,26 @@
+# Generated by Django 2.1.15 on 2026-10-18 10:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('omni_blocks', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RenditionPlaceholder',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('label', models.CharField(max_length=100)),
+                ('rendition_id', models.CharField(max_length=255)),
+                ('data_uri', models.TextField()),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='renditionplaceholder',
+            unique_together={('label', 'rendition_id')},
+        ),
+    ]
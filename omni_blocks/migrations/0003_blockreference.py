@@ -0,0 +1,30 @@
+# Generated by Django 2.1.15 on 2026-10-18 10:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wagtailcore', '0040_page_draft_title'),
+        ('omni_blocks', '0002_renditionplaceholder'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BlockReference',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field_name', models.CharField(max_length=255)),
+                ('block_type', models.CharField(max_length=255)),
+                ('label', models.CharField(max_length=100)),
+                ('object_id', models.CharField(max_length=255)),
+                ('page', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='wagtailcore.Page')),
+            ],
+        ),
+        migrations.AlterIndexTogether(
+            name='blockreference',
+            index_together={('label', 'object_id')},
+        ),
+    ]
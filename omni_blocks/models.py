@@ -0,0 +1,76 @@
+from __future__ import unicode_literals
+
+from django.db import models
+
+
+class PrerenderedBlock(models.Model):
+    """The HTML of a top level StreamField block, rendered as its page was published."""
+
+    revision = models.ForeignKey(
+        "wagtailcore.PageRevision", on_delete=models.CASCADE, related_name="+"
+    )
+    field_name = models.CharField(max_length=255)
+    position = models.PositiveIntegerField()
+    block_type = models.CharField(max_length=255)
+    value_hash = models.CharField(max_length=40)
+    html = models.TextField()
+    stale = models.BooleanField(default=False)
+    rendered_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta(object):
+        unique_together = ("revision", "field_name", "position")
+
+    def __str__(self):
+        return "{} #{} of revision {}".format(
+            self.field_name, self.position, self.revision_id
+        )
+
+
+class PrerenderedReference(models.Model):
+    """A page or image shown by a prerendered block."""
+
+    block = models.ForeignKey(
+        PrerenderedBlock, on_delete=models.CASCADE, related_name="references"
+    )
+    label = models.CharField(max_length=100)
+    object_id = models.CharField(max_length=255)
+
+    class Meta(object):
+        index_together = ("label", "object_id")
+
+    def __str__(self):
+        return "{} {}".format(self.label, self.object_id)
+
+
+class RenditionPlaceholder(models.Model):
+    """A tiny inline version of a rendition, shown while the rendition loads."""
+
+    label = models.CharField(max_length=100)
+    rendition_id = models.CharField(max_length=255)
+    data_uri = models.TextField()
+
+    class Meta(object):
+        unique_together = ("label", "rendition_id")
+
+    def __str__(self):
+        return "{} {}".format(self.label, self.rendition_id)
+
+
+class BlockReference(models.Model):
+    """A page or image chosen in an omni_blocks block of a page."""
+
+    page = models.ForeignKey(
+        "wagtailcore.Page", on_delete=models.CASCADE, related_name="+"
+    )
+    field_name = models.CharField(max_length=255)
+    block_type = models.CharField(max_length=255)
+    label = models.CharField(max_length=100)
+    object_id = models.CharField(max_length=255)
+
+    class Meta(object):
+        index_together = ("label", "object_id")
+
+    def __str__(self):
+        return "{} {} in {} of page {}".format(
+            self.label, self.object_id, self.field_name, self.page_id
+        )
@@ -0,0 +1,68 @@
+from __future__ import unicode_literals
+
+from wagtail.core.models import Page
+
+
+REQUEST_ATTR = "_omni_blocks_page_urls"
+SAVED_URL_PATH_ATTR = "_omni_blocks_saved_url_path"
+
+
+def get_page_url(page, request=None):
+    """
+    Get the URL of a page, computed once per request for each page and site.
+
+    With a request, the URL is relative when the page is on the request's
+    site, and the site root paths are only looked up once for the request.
+
+    :param page: A page, or None.
+    :param request: The current request, or None.
+    :return: The URL, or an empty string if the page is missing or not routable.
+    """
+    if page is None:
+        return ""
+    if request is None:
+        return page.url or ""
+
+    memo = getattr(request, REQUEST_ATTR, None)
+    if memo is None:
+        memo = {}
+        setattr(request, REQUEST_ATTR, memo)
+    site = getattr(request, "site", None)
+    key = (page.pk, site.pk if site is not None else None)
+    if key not in memo:
+        memo[key] = page.get_url(request=request) or ""
+    return memo[key]
+
+
+def remember_url_path(page, update_fields=None):
+    """
+    Remember the stored URL path of a page about to be saved, to spot moves.
+
+    Like Wagtail, the path is only looked up when the save can change the slug,
+    and for pages that already exist.
+
+    :param page: The page about to be saved.
+    :param update_fields: The fields being saved, or None for all of them.
+    """
+    saved_url_path = None
+    if page.pk is not None and (update_fields is None or "slug" in update_fields):
+        url_paths = Page.objects.filter(pk=page.pk).values_list("url_path", flat=True)
+        saved_url_path = url_paths.first()
+    setattr(page, SAVED_URL_PATH_ATTR, saved_url_path)
+
+
+def get_moved_descendant_ids(page):
+    """
+    Get the ids of the descendants of a page whose URL changed as it was saved.
+
+    Renaming or moving a page changes the URL of all its descendants, which
+    Wagtail updates without saving them, so no signal is sent for them.
+
+    :param page: A page that has just been saved, see `remember_url_path`.
+    :return: List of page ids, empty unless the page's URL path changed.
+    """
+    saved_url_path = getattr(page, SAVED_URL_PATH_ATTR, None)
+    if saved_url_path is None or saved_url_path == page.url_path:
+        return []
+    descendants = Page.objects.descendant_of(page)
+    return list(descendants.values_list("pk", flat=True))
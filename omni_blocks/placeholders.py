@@ -0,0 +1,118 @@
+from __future__ import unicode_literals
+
+import base64
+from io import BytesIO
+
+from django.conf import settings
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from wagtail.images.models import AbstractRendition
+from willow.image import Image as WillowImage
+
+from omni_blocks.models import RenditionPlaceholder
+
+
+PLACEHOLDER_ATTR = "_omni_blocks_placeholder"
+
+#: Width of the placeholders in pixels, the height keeps the rendition's aspect ratio.
+PLACEHOLDER_WIDTH = 16
+
+
+def placeholders_enabled():
+    """Whether image blocks inline placeholders, by `OMNI_BLOCKS_IMAGE_PLACEHOLDERS`."""
+    return getattr(settings, "OMNI_BLOCKS_IMAGE_PLACEHOLDERS", False)
+
+
+def make_placeholder(rendition):
+    """
+    Shrink a rendition into a PNG data URI.
+
+    :param rendition: A rendition instance.
+    :return: The data URI.
+    """
+    width = min(PLACEHOLDER_WIDTH, rendition.width)
+    height = max(1, int(round(rendition.height * width / float(rendition.width))))
+    with rendition.file.open("rb") as image_file:
+        image = WillowImage.open(image_file).resize((width, height))
+        output = BytesIO()
+        image.save_as_png(output)
+    data = base64.b64encode(output.getvalue()).decode("ascii")
+    return "data:image/png;base64,{}".format(data)
+
+
+def store_placeholders(renditions):
+    """
+    Generate and store the placeholders that do not exist yet.
+
+    :param renditions: Iterable of rendition instances.
+    """
+    renditions = {(r._meta.label_lower, str(r.pk)): r for r in renditions if r and r.pk}
+    if not renditions:
+        return
+
+    existing = set(
+        RenditionPlaceholder.objects.filter(
+            label__in={label for label, _ in renditions},
+            rendition_id__in=[pk for _, pk in renditions],
+        ).values_list("label", "rendition_id")
+    )
+    placeholders = []
+    for (label, pk), rendition in renditions.items():
+        if (label, pk) not in existing:
+            data_uri = make_placeholder(rendition)
+            setattr(rendition, PLACEHOLDER_ATTR, data_uri)
+            placeholders.append(
+                RenditionPlaceholder(label=label, rendition_id=pk, data_uri=data_uri)
+            )
+    RenditionPlaceholder.objects.bulk_create(placeholders)
+
+
+def prefetch_placeholders(renditions):
+    """
+    Load the stored placeholders of several renditions with a single query.
+
+    :param renditions: Iterable of rendition instances.
+    """
+    renditions = [rendition for rendition in renditions if rendition and rendition.pk]
+    wanted = {}
+    for rendition in renditions:
+        if not hasattr(rendition, PLACEHOLDER_ATTR):
+            key = (rendition._meta.label_lower, str(rendition.pk))
+            wanted.setdefault(key, []).append(rendition)
+            setattr(rendition, PLACEHOLDER_ATTR, None)
+    if not wanted:
+        return
+
+    placeholders = RenditionPlaceholder.objects.filter(
+        label__in={label for label, _ in wanted},
+        rendition_id__in=[pk for _, pk in wanted],
+    ).values_list("label", "rendition_id", "data_uri")
+    for label, pk, data_uri in placeholders:
+        for rendition in wanted.get((label, pk), ()):
+            setattr(rendition, PLACEHOLDER_ATTR, data_uri)
+
+
+def get_placeholder(rendition):
+    """
+    Get the stored placeholder of a rendition.
+
+    Placeholders are only generated ahead of time, by `store_placeholders`,
+    so a rendition without one has None rather than being shrunk on request.
+
+    :param rendition: A rendition instance.
+    :return: The data URI, or None.
+    """
+    if not rendition or not rendition.pk:
+        return None
+    if not hasattr(rendition, PLACEHOLDER_ATTR):
+        prefetch_placeholders([rendition])
+    return getattr(rendition, PLACEHOLDER_ATTR)
+
+
+@receiver(post_delete)
+def delete_placeholder(sender, instance, **kwargs):
+    """Delete the placeholder of a deleted rendition."""
+    if isinstance(instance, AbstractRendition) and placeholders_enabled():
+        RenditionPlaceholder.objects.filter(
+            label=instance._meta.label_lower, rendition_id=str(instance.pk)
+        ).delete()
@@ -0,0 +1,163 @@
+from __future__ import unicode_literals
+
+from collections import defaultdict
+
+from wagtail.core.blocks import StreamValue
+from wagtail.core.models import Page
+
+from omni_blocks.blocks.mixins import (
+    PagePrefetchMixin,
+    RenditionSpecsMixin,
+    load_chooser_instances,
+    prefetched_choosers,
+    prefetched_pages,
+)
+from omni_blocks.walk import walk_raw, walk_values
+
+
+def iter_unconverted(stream_value):
+    """
+    Yield `(block, raw value)` for the children of a lazy StreamValue not yet converted.
+
+    :param stream_value: A StreamValue.
+    """
+    if not stream_value.is_lazy:
+        return
+
+    child_blocks = stream_value.stream_block.child_blocks
+    for index, item in enumerate(stream_value.stream_data):
+        # StreamValue keeps converted children in `_bound_blocks`
+        if index in stream_value._bound_blocks:
+            continue
+        child_block = child_blocks.get(item.get("type"))
+        if child_block is not None:
+            yield child_block, item.get("value")
+
+
+def iter_converted(stream_value):
+    """
+    Yield `(block, value)` for the children of a StreamValue already converted.
+
+    :param stream_value: A StreamValue.
+    """
+    for index in range(len(stream_value)):
+        if stream_value.is_lazy and index not in stream_value._bound_blocks:
+            continue
+        child = stream_value[index]
+        yield child.block, child.value
+
+
+def iter_raw_values(stream_value):
+    """
+    Yield `(block, raw value)` for every block within the unconverted children of a
+    StreamValue.
+
+    :param stream_value: A StreamValue.
+    """
+    for child_block, raw_value in iter_unconverted(stream_value):
+        for pair in walk_raw(child_block, raw_value):
+            yield pair
+
+
+def get_link_page_ids(raw_values):
+    """
+    Get the ids of the internal pages of the links among raw block values.
+
+    :param raw_values: Iterable of `(block, raw value)`.
+    :return: Set of page ids.
+    """
+    page_ids = set()
+    for block, value in raw_values:
+        if isinstance(block, PagePrefetchMixin):
+            page_id = block.get_prefetch_page_id(value)
+            if page_id:
+                page_ids.add(page_id)
+    return page_ids
+
+
+def get_stream_renditions(stream_value):
+    """
+    Get the images of a converted StreamValue by the filter specs their blocks render.
+
+    :param stream_value: A StreamValue.
+    :return: Dict of a tuple of filter specs to a list of images.
+    """
+    images_by_specs = defaultdict(list)
+    for block, value in walk_values(stream_value.stream_block, stream_value):
+        if isinstance(block, RenditionSpecsMixin) and block.rendition_specs:
+            images = [image for image in block.get_rendition_images(value) if image]
+            images_by_specs[tuple(block.rendition_specs)].extend(images)
+    return images_by_specs
+
+
+def load_pages(page_ids, specific=False):
+    """
+    Load pages in one query, or one query per page type when `specific` is set.
+
+    :param page_ids: Iterable of page ids.
+    :param specific: Whether to load the specific page subclasses.
+    :return: Dict of page id to page, with `None` for pages that do not exist.
+    """
+    page_ids = set(page_ids)
+    if not page_ids:
+        return {}
+
+    queryset = Page.objects.filter(pk__in=page_ids)
+    if specific:
+        queryset = queryset.specific()
+    pages = dict.fromkeys(page_ids)
+    pages.update((page.pk, page) for page in queryset)
+    return pages
+
+
+def prefetch_link_pages(stream_value, specific=False, choosers=False):
+    """
+    Load the internal page of every link in a StreamValue with a single query.
+
+    Every omni_blocks block with a link (`LinkBlock`, `TitledLinkBlock`,
+    `ButtonBlock`, `BasicCardBlock`, `LinkedImageBlock`, `FlowBlock` and the
+    lists of them) is converted using the loaded pages, so rendering the
+    stream afterwards runs no page queries for its links.
+
+    :param stream_value: A StreamValue, usually a page's StreamField value.
+    :param specific: Whether links should resolve to specific page subclasses.
+    :param choosers: Whether to also load the other chooser values, e.g. the
+        images of every card, with one query per model.
+    :return: The same StreamValue, with its children converted.
+    """
+    if not isinstance(stream_value, StreamValue):
+        return stream_value
+
+    converted = list(iter_converted(stream_value))
+    raw_values = list(iter_raw_values(stream_value))
+    page_ids = get_link_page_ids(raw_values)
+
+    with prefetched_pages(load_pages(page_ids, specific=specific)):
+        # Inside `prefetched_pages`, so the link pages are not loaded twice
+        instances = load_chooser_instances(raw_values) if choosers else {}
+        with prefetched_choosers(instances):
+            for _ in stream_value:
+                pass
+
+    if specific:
+        _specialise_link_pages(converted)
+
+    return stream_value
+
+
+def _specialise_link_pages(children):
+    """Swap the generic pages of already converted links for specific ones."""
+    links = []
+    for child_block, child_value in children:
+        for block, value in walk_values(child_block, child_value):
+            if isinstance(block, PagePrefetchMixin) and value:
+                page = value.get(block.prefetch_page_field)
+                if page is not None and type(page) is not page.specific_class:
+                    links.append((block.prefetch_page_field, value))
+
+    if not links:
+        return
+
+    pages = load_pages((value[field].pk for field, value in links), specific=True)
+    for field, value in links:
+        value[field] = pages[value[field].pk]
@@ -0,0 +1,235 @@
+from __future__ import unicode_literals
+
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.http import HttpRequest
+from django.utils.html import format_html_join
+from django.utils.safestring import mark_safe
+from wagtail.core.fields import StreamField
+from wagtail.core.models import Page
+from wagtail.core.signals import page_published, page_unpublished
+from wagtail.images.models import AbstractImage
+
+from omni_blocks.fragment_cache import iter_references
+from omni_blocks.models import PrerenderedBlock, PrerenderedReference
+from omni_blocks.page_urls import get_moved_descendant_ids, remember_url_path
+from omni_blocks.walk import walk_values
+
+#: Modules whose blocks render the same for every request unless they opt out,
+#: the blocks of other modules must opt in with `prerender = True`.
+PRERENDER_MODULES = ("omni_blocks.", "wagtail.")
+
+
+def prerender_enabled():
+    """Whether blocks are prerendered on publish, set by `OMNI_BLOCKS_PRERENDER`."""
+    return getattr(settings, "OMNI_BLOCKS_PRERENDER", False)
+
+
+def hash_raw_block(raw_block):
+    """
+    Hash the stored JSON of a top level StreamField block.
+
+    :param raw_block: The raw block, a dict with `type`, `value` and `id`.
+    :return: Hex digest of the block.
+    """
+    data = json.dumps(raw_block, cls=DjangoJSONEncoder, sort_keys=True)
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+
+def is_prerenderable_block(block):
+    """
+    Whether a block renders the same for every request, set by its `prerender` attribute.
+
+    Blocks of omni_blocks and Wagtail default to True, and opt out by setting
+    `prerender = False`, as the headings do, since their anchors depend on the
+    other headings rendered in the request. Other blocks default to False.
+
+    :param block: A block definition.
+    :return: Boolean.
+    """
+    default = type(block).__module__.startswith(PRERENDER_MODULES)
+    return getattr(block, "prerender", default)
+
+
+def is_prerenderable(child):
+    """
+    Whether a top level block, and every block nested within it, can be prerendered.
+
+    :param child: A StreamValue child.
+    :return: Boolean.
+    """
+    blocks = walk_values(child.block, child.value)
+    return all(is_prerenderable_block(block) for block, _ in blocks)
+
+
+def get_prerender_request(page):
+    """
+    Build a request for the site of a page, for the blocks to render as they do live.
+
+    Page URLs are relative to the request's site, so links render as they do
+    on the pages served from that site.
+
+    :param page: The page being prerendered.
+    :return: An HttpRequest, or None if the page isn't on a site.
+    """
+    site = page.get_site()
+    if site is None:
+        return None
+    request = HttpRequest()
+    request.META["SERVER_NAME"] = site.hostname
+    request.META["SERVER_PORT"] = str(site.port)
+    request.site = site
+    return request
+
+
+def get_stream_field_names(page):
+    """Get the names of the StreamFields of a page."""
+    return [
+        field.name for field in page._meta.get_fields() if isinstance(field, StreamField)
+    ]
+
+
+def prerender_stream(revision, field_name, stream_value, context=None):
+    """
+    Render and store every top level block of a StreamValue for a revision.
+
+    :param revision: The PageRevision the StreamValue belongs to.
+    :param field_name: The name of the StreamField.
+    :param stream_value: The lazy StreamValue loaded from the revision.
+    :param context: The context to render the blocks with.
+    :return: List of the PrerenderedBlocks created.
+    """
+    if not stream_value.is_lazy:
+        return []
+
+    blocks = []
+    references = []
+    for position, raw_block in enumerate(stream_value.stream_data):
+        child = stream_value[position]
+        if not is_prerenderable(child):
+            continue
+        block = PrerenderedBlock(
+            revision=revision,
+            field_name=field_name,
+            position=position,
+            block_type=child.block_type,
+            value_hash=hash_raw_block(raw_block),
+            html=child.render(context=context),
+        )
+        blocks.append(block)
+        references.append(set(iter_references(child.value)))
+
+    for block, block_references in zip(blocks, references):
+        block.save()
+        PrerenderedReference.objects.bulk_create(
+            PrerenderedReference(block=block, label=label, object_id=str(pk))
+            for label, pk in block_references
+        )
+    return blocks
+
+
+def prerender_page(page, revision):
+    """
+    Render and store the blocks of every StreamField of a page, replacing older ones.
+
+    :param page: The specific page, as published.
+    :param revision: The PageRevision being published.
+    """
+    context = {"page": page, "self": page, "request": get_prerender_request(page)}
+    with transaction.atomic():
+        PrerenderedBlock.objects.filter(revision__page_id=page.pk).delete()
+        for field_name in get_stream_field_names(page):
+            stream_value = getattr(page, field_name)
+            if stream_value is not None:
+                prerender_stream(revision, field_name, stream_value, context=context)
+
+
+def render_prerendered(page, field_name, context=None):
+    """
+    Render a StreamField of a live page, serving the blocks stored at publish time.
+
+    Blocks that were not stored, no longer match the field's content or show a
+    page or image that has changed since are rendered as usual. The output
+    matches `{% include_block page.field_name %}`.
+
+    :param page: The page.
+    :param field_name: The name of the StreamField.
+    :param context: The context to render the blocks that are not stored with.
+    :return: The rendered HTML.
+    """
+    stream_value = getattr(page, field_name)
+    if stream_value is None:
+        return ""
+
+    stored = {}
+    if stream_value.is_lazy and page.live_revision_id:
+        blocks = PrerenderedBlock.objects.filter(
+            revision_id=page.live_revision_id, field_name=field_name, stale=False
+        ).only("position", "value_hash", "html")
+        stored = {block.position: block for block in blocks}
+
+    rendered = []
+    for position in range(len(stream_value)):
+        block = stored.get(position)
+        if block is not None:
+            raw_block = stream_value.stream_data[position]
+            if block.value_hash == hash_raw_block(raw_block):
+                rendered.append((mark_safe(block.html), raw_block["type"]))
+                continue
+        child = stream_value[position]
+        rendered.append((child.render(context=context), child.block_type))
+
+    return format_html_join("\n", '<div class="block-{1}">{0}</div>', rendered)
+
+
+@receiver(page_published)
+def prerender_published_page(sender, instance, revision, **kwargs):
+    """Prerender the blocks of a page as it is published."""
+    if prerender_enabled():
+        prerender_page(instance, revision)
+
+
+@receiver(page_unpublished)
+def delete_unpublished_page(sender, instance, **kwargs):
+    """Forget the prerendered blocks of a page that is no longer live."""
+    if prerender_enabled():
+        PrerenderedBlock.objects.filter(revision__page_id=instance.pk).delete()
+
+
+@receiver(pre_save)
+def remember_page_url_path(sender, instance, update_fields=None, **kwargs):
+    """Remember the URL path of a page before it is saved, to spot renames and moves."""
+    if isinstance(instance, Page) and prerender_enabled():
+        remember_url_path(instance, update_fields=update_fields)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def mark_stale(sender, instance, **kwargs):
+    """
+    Mark the prerendered blocks showing a page or image that has changed as stale.
+
+    Renaming or moving a page also marks the blocks showing its descendants,
+    as their URLs have changed with it.
+    """
+    if isinstance(instance, Page):
+        label = Page._meta.label_lower
+    elif isinstance(instance, AbstractImage):
+        label = instance._meta.label_lower
+    else:
+        return
+
+    if not prerender_enabled() or instance.pk is None:
+        return
+    pks = [instance.pk]
+    if isinstance(instance, Page) and kwargs.get("signal") is post_save:
+        pks.extend(get_moved_descendant_ids(instance))
+    PrerenderedBlock.objects.filter(
+        references__label=label, references__object_id__in=[str(pk) for pk in pks]
+    ).update(stale=True)
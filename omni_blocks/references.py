@@ -0,0 +1,135 @@
+from __future__ import unicode_literals
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from wagtail.core.models import Page
+from wagtail.images.models import AbstractImage
+
+from omni_blocks.blocks.chooser_blocks import PageChooserTemplateBlock
+from omni_blocks.blocks.mixins import BulkChooserMixin
+from omni_blocks.models import BlockReference
+from omni_blocks.prerender import get_stream_field_names
+from omni_blocks.signals import referenced_object_changed
+from omni_blocks.walk import walk_raw
+
+
+def reference_index_enabled():
+    """Whether the reference index is kept updated, by `OMNI_BLOCKS_REFERENCE_INDEX`."""
+    return getattr(settings, "OMNI_BLOCKS_REFERENCE_INDEX", False)
+
+
+def get_reference_label(model):
+    """
+    Get the label references to a model are stored under.
+
+    Every page is stored as a `wagtailcore.page`, whatever its specific type.
+    """
+    if issubclass(model, Page):
+        return Page._meta.label_lower
+    return model._meta.label_lower
+
+
+def iter_raw_references(block, value):
+    """
+    Yield `(block, model label, pk)` for every page and image chosen in a raw value.
+
+    :param block: The block definition.
+    :param value: The raw (JSON) value of the block.
+    """
+    for child_block, child_value in walk_raw(block, value):
+        if isinstance(child_block, PageChooserTemplateBlock):
+            pk = child_block.get_page_id(child_value)
+            label = Page._meta.label_lower
+        elif isinstance(child_block, BulkChooserMixin):
+            pk = child_block.get_bulk_pk(child_value)
+            label = get_reference_label(child_block.target_model)
+        else:
+            continue
+        if pk is not None:
+            yield child_block, label, pk
+
+
+def get_page_references(page):
+    """
+    Build the references of the omni_blocks blocks of a page, from the raw StreamFields.
+
+    :param page: The specific page.
+    :return: List of unsaved BlockReferences.
+    """
+    references = set()
+    for field_name in get_stream_field_names(page):
+        stream_value = getattr(page, field_name)
+        if stream_value is None:
+            continue
+        # Unconverted children keep their raw data, so nothing is queried
+        stream_block = stream_value.stream_block
+        raw_stream = stream_block.get_prep_value(stream_value)
+        for block, label, pk in iter_raw_references(stream_block, raw_stream):
+            references.add((field_name, type(block).__name__, label, str(pk)))
+    return [
+        BlockReference(
+            page=page,
+            field_name=field_name,
+            block_type=block_type,
+            label=label,
+            object_id=pk,
+        )
+        for field_name, block_type, label, pk in sorted(references)
+    ]
+
+
+def index_page(page):
+    """
+    Replace the indexed references of a page.
+
+    :param page: The specific page.
+    :return: List of the BlockReferences created.
+    """
+    references = get_page_references(page)
+    with transaction.atomic():
+        BlockReference.objects.filter(page_id=page.pk).delete()
+        return BlockReference.objects.bulk_create(references)
+
+
+def get_referencing_pages(instance):
+    """
+    Get the pages with an omni_blocks block referencing a page or image.
+
+    :param instance: A page or image.
+    :return: Page queryset.
+    """
+    page_ids = BlockReference.objects.filter(
+        label=get_reference_label(type(instance)), object_id=str(instance.pk)
+    ).values("page_id")
+    return Page.objects.filter(pk__in=page_ids)
+
+
+@receiver(post_save)
+def index_saved_page(sender, instance, update_fields=None, **kwargs):
+    """Index the references of a page as its content is saved, e.g. on publish."""
+    if not isinstance(instance, Page) or not reference_index_enabled():
+        return
+    if type(instance) is not instance.specific_class:
+        # A generic page, e.g. saved as it is moved, doesn't have the StreamFields
+        return
+    field_names = get_stream_field_names(instance)
+    if update_fields is not None and not set(update_fields) & set(field_names):
+        # e.g. saving a draft revision only updates the draft state of the page
+        return
+    index_page(instance)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def notify_referencing_pages(sender, instance, **kwargs):
+    """Send `referenced_object_changed` as a page or image is saved or deleted."""
+    if not isinstance(instance, (Page, AbstractImage)) or not reference_index_enabled():
+        return
+    if instance.pk is not None:
+        referenced_object_changed.send(
+            sender=type(instance),
+            instance=instance,
+            pages=get_referencing_pages(instance),
+        )
@@ -0,0 +1,107 @@
+from __future__ import unicode_literals
+
+from collections import defaultdict
+
+from wagtail.images.models import Filter
+from wagtail.images.shortcuts import get_rendition_or_not_found
+
+
+RENDITIONS_ATTR = "_omni_blocks_renditions"
+
+
+def prefetch_renditions(images, filter_specs):
+    """
+    Resolve every (image, filter spec) rendition in one query per rendition model.
+
+    The renditions are stored on the image instances themselves, so later calls
+    to `get_rendition` for the same image and spec are served from memory.
+    Renditions that do not exist yet are generated through Wagtail as usual.
+
+    :param images: Iterable of image instances, `None` values are skipped.
+    :param filter_specs: Iterable of filter spec strings, e.g. `"width-1400"`.
+    :return: None
+    """
+    images = [image for image in images if image]
+    filter_specs = list(filter_specs)
+    if not images or not filter_specs:
+        return
+
+    filters = [Filter(spec=spec) for spec in filter_specs]
+    images_by_model = defaultdict(lambda: defaultdict(list))
+    for image in images:
+        # The same image may be chosen more than once, as separate instances
+        images_by_model[image.get_rendition_model()][image.pk].append(image)
+
+    for rendition_model, images_by_pk in images_by_model.items():
+        wanted = {}
+        for pk, instances in images_by_pk.items():
+            for image in instances:
+                if getattr(image, RENDITIONS_ATTR, None) is None:
+                    setattr(image, RENDITIONS_ATTR, {})
+            for image_filter in filters:
+                if any(
+                    image_filter.spec not in getattr(image, RENDITIONS_ATTR)
+                    for image in instances
+                ):
+                    focal_point_key = image_filter.get_cache_key(instances[0])
+                    wanted[(pk, image_filter.spec, focal_point_key)] = instances
+
+        if not wanted:
+            continue
+
+        renditions = rendition_model.objects.filter(
+            image_id__in=list(images_by_pk), filter_spec__in=filter_specs
+        )
+        for rendition in renditions:
+            key = (rendition.image_id, rendition.filter_spec, rendition.focal_point_key)
+            instances = wanted.pop(key, None)
+            if instances is not None:
+                # Sharing the image instance saves a query for `rendition.alt`
+                rendition.image = instances[0]
+                for image in instances:
+                    getattr(image, RENDITIONS_ATTR)[rendition.filter_spec] = rendition
+
+        # Anything left over has never been generated
+        for (_, spec, _), instances in wanted.items():
+            rendition = get_rendition(instances[0], spec)
+            for image in instances[1:]:
+                getattr(image, RENDITIONS_ATTR)[spec] = rendition
+
+
+def get_rendition(image, filter_spec):
+    """
+    Return the rendition of `image` for `filter_spec`, preferring prefetched ones.
+
+    :param image: An image instance.
+    :param filter_spec: A filter spec string, e.g. `"width-1400"`.
+    :return: A rendition instance.
+    """
+    memo = getattr(image, RENDITIONS_ATTR, None)
+    if memo is None:
+        memo = {}
+        setattr(image, RENDITIONS_ATTR, memo)
+    if filter_spec not in memo:
+        memo[filter_spec] = get_rendition_or_not_found(image, filter_spec)
+    return memo[filter_spec]
+
+
+def get_image_api_representation(image, filter_specs):
+    """
+    Represent an image and its renditions for the API.
+
+    :param image: An image instance, or None.
+    :param filter_specs: Iterable of filter spec strings.
+    :return: Dict with the image's `id`, `title` and `renditions` by filter spec, or
+        None.
+    """
+    if not image:
+        return None
+    renditions = {}
+    for spec in filter_specs:
+        rendition = get_rendition(image, spec)
+        renditions[spec] = {
+            "url": rendition.url,
+            "width": rendition.width,
+            "height": rendition.height,
+        }
+    return {"id": image.pk, "title": image.title, "renditions": renditions}
@@ -0,0 +1,14 @@
+from __future__ import unicode_literals
+
+from django.dispatch import Signal
+
+
+#: Sent after an omni_blocks block renders, while `record_renders` is active.
+#: The sender is the block class; the timings include any nested blocks.
+block_rendered = Signal(
+    providing_args=["block", "path", "duration", "queries", "template_loads"]
+)
+
+#: Sent after a page or image referenced by omni_blocks blocks is saved or deleted,
+#: while the reference index is enabled. `pages` is a queryset of the referencing pages.
+referenced_object_changed = Signal(providing_args=["instance", "pages"])
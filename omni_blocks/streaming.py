@@ -0,0 +1,35 @@
+from __future__ import unicode_literals
+
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+
+from omni_blocks.blocks.mixins import StreamingRenderMixin
+
+
+def render_stream(stream_value, context=None):
+    """
+    Render a StreamValue as a generator of HTML chunks.
+
+    The output matches `{% include_block stream_value %}`, but list blocks with
+    `render_stream` yield one chunk per child rather than one per block, so the
+    generator can be passed straight to `StreamingHttpResponse`::
+
+        return StreamingHttpResponse(render_stream(page.body, {"request": request}))
+
+    :param stream_value: A StreamValue, usually a page's StreamField value.
+    :param context: The context to render the blocks with.
+    """
+    stream_block = stream_value.stream_block
+    if stream_block.get_template(context=context):
+        yield stream_block.render(stream_value, context=context)
+        return
+
+    for index, child in enumerate(stream_value):
+        opening = format_html('<div class="block-{0}">', child.block_type)
+        yield mark_safe(opening if index == 0 else "\n" + opening)
+        if isinstance(child.block, StreamingRenderMixin):
+            for chunk in child.block.render_stream(child.value, context=context):
+                yield chunk
+        else:
+            yield child.render(context=context)
+        yield mark_safe("</div>")
@@ -0,0 +1,110 @@
+from __future__ import unicode_literals
+
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.template.backends.django import Template as BackendTemplate
+from django.template.base import Template, TextNode
+from django.template.loader import get_template
+
+
+#: HTML comments, except conditional comments.
+COMMENT_RE = re.compile(r"<!--(?!\[if).*?-->", re.DOTALL)
+WHITESPACE_RE = re.compile(r"\s+")
+#: Elements whose whitespace is significant, e.g. the newline ending a `//` comment
+#: in a script, templates with them are not minified.
+PREFORMATTED_RE = re.compile(r"<(pre|textarea|script|style)\b", re.IGNORECASE)
+
+
+def cache_templates():
+    """
+    Whether block templates are resolved once per process.
+
+    Controlled by the `OMNI_BLOCKS_CACHE_TEMPLATES` setting, which defaults to
+    `not DEBUG` so template changes are picked up during development.
+    """
+    return getattr(settings, "OMNI_BLOCKS_CACHE_TEMPLATES", not settings.DEBUG)
+
+
+def minify_templates():
+    """Whether cached block templates are minified, by `OMNI_BLOCKS_MINIFY_TEMPLATES`."""
+    return getattr(settings, "OMNI_BLOCKS_MINIFY_TEMPLATES", False)
+
+
+def minify_html(text):
+    """
+    Strip the comments from HTML and collapse each run of whitespace into a single space.
+
+    Browsers collapse whitespace between most elements the same way, but not
+    within `<pre>`, `<textarea>`, `<script>` or `<style>`, so text containing
+    them must not be minified.
+
+    :param text: HTML text.
+    :return: The minified text.
+    """
+    return WHITESPACE_RE.sub(" ", COMMENT_RE.sub("", text))
+
+
+def minify_template(template):
+    """
+    Compile a minified copy of a Django template.
+
+    Only the text between template tags is minified, so variables and tags
+    render as before. Templates of other engines, or with preformatted, script
+    or style elements, are returned as they are.
+
+    :param template: A template object, as returned by `get_template`.
+    :return: A template object.
+    """
+    compiled = getattr(template, "template", None)
+    if not isinstance(compiled, Template) or PREFORMATTED_RE.search(compiled.source):
+        return template
+
+    # Compiled again, rather than changing the copy shared by Django's template loaders
+    minified = Template(
+        compiled.source,
+        origin=compiled.origin,
+        name=compiled.name,
+        engine=compiled.engine,
+    )
+    for node in minified.nodelist.get_nodes_by_type(TextNode):
+        node.s = minify_html(node.s)
+    return BackendTemplate(minified, template.backend)
+
+
+@lru_cache(maxsize=None)
+def _get_cached_template(name):
+    template = get_template(name)
+    if minify_templates():
+        template = minify_template(template)
+    return template
+
+
+def get_block_template(name):
+    """
+    Get a template object by name, resolving each name only once per process.
+
+    With `OMNI_BLOCKS_MINIFY_TEMPLATES` set, the cached templates are minified
+    as they are resolved.
+
+    :param name: The template name, e.g. "blocks/basic_card_block.html".
+    :return: A template object, rendered with a flat context dict.
+    """
+    if cache_templates():
+        return _get_cached_template(name)
+    return get_template(name)
+
+
+@receiver(setting_changed)
+def clear_template_cache(setting, **kwargs):
+    """Forget the resolved templates when the template settings change."""
+    if setting in (
+        "TEMPLATES",
+        "DEBUG",
+        "OMNI_BLOCKS_CACHE_TEMPLATES",
+        "OMNI_BLOCKS_MINIFY_TEMPLATES",
+    ):
+        _get_cached_template.cache_clear()
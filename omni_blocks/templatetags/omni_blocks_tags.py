@@ -1,46 +1,138 @@
 from __future__ import unicode_literals
 
-from collections import namedtuple
-
 from django import template
+from django.utils.html import format_html
 
-from omni_blocks.blocks.text_blocks import JumpHBlock
+from omni_blocks import page_urls, placeholders, prefetch, prerender, renditions
+from omni_blocks.jumplist import Anchor, get_jumplist_index  # noqa: F401
 
 
 register = template.Library()
 
 
-Anchor = namedtuple("Anchor", ["value", "href"])
-
-
-@register.simple_tag
-def has_jumplist(calling_page, field):
+def has_jumplist(calling_page, field, request=None):
     """
     Determine if one or more JumpHBlocks exist within a streamfield.
 
     :param page: The Page object that contains a streamfield.
     :param field: A streamfield that may contain one or more JumpHBlock.
+    :param request: The current request, the index is built once per request.
     :return: Boolean - Returns `True` if JumpHBlock is within the field.
     """
-    body = getattr(calling_page, field, [])
-    return any(isinstance(item.block, JumpHBlock) for item in body)
+    return get_jumplist_index(calling_page, field, request=request).has_jumplist
 
 
-@register.simple_tag
-def get_jumplist(calling_page, field):
+def get_jumplist(calling_page, field, request=None):
     """
     Gets all JumpHBlocks from a given streamfield and loads them into an array.
     Used in base.html to render a jumplist for navigation around the page.
 
     :param page: The Page object that contains a streamfield.
     :param field: A streamfield that may contain one or more JumpHBlock.
+    :param request: The current request, the index is built once per request.
     :return: List - Returns a list of JumpHBlock instances.
     """
-    anchors = []
-    body = getattr(calling_page, field, [])
-    for item in body:
-        if isinstance(item.block, JumpHBlock):
-            anchors.append(
-                Anchor(value=item.value, href="#{}".format(JumpHBlock.make_jump_link(item.value)))
-            )
-    return anchors
+    return get_jumplist_index(calling_page, field, request=request).anchors
+
+
+@register.simple_tag(takes_context=True, name="has_jumplist")
+def has_jumplist_tag(context, calling_page, field):
+    """Template tag for `has_jumplist`, sharing the index with the whole request."""
+    return has_jumplist(calling_page, field, request=context.get("request"))
+
+
+@register.simple_tag(takes_context=True, name="get_jumplist")
+def get_jumplist_tag(context, calling_page, field):
+    """Template tag for `get_jumplist`, sharing the index with the whole request."""
+    return get_jumplist(calling_page, field, request=context.get("request"))
+
+
+@register.simple_tag(takes_context=True, name="get_jumplist_index")
+def get_jumplist_index_tag(context, calling_page, field):
+    """
+    Gets both whether a streamfield has a jumplist and its anchors.
+    Used as `{% get_jumplist_index page "body" as jumplist %}`, then
+    `jumplist.has_jumplist` and `jumplist.anchors`.
+
+    :param page: The Page object that contains a streamfield.
+    :param field: A streamfield that may contain one or more JumpHBlock.
+    :return: JumplistIndex - Returns the jumplist index of the field.
+    """
+    return get_jumplist_index(calling_page, field, request=context.get("request"))
+
+
+@register.simple_tag
+def get_rendition(image, filter_spec):
+    """
+    Gets a rendition of an image, using any renditions prefetched by the block.
+
+    :param image: The image to get a rendition of.
+    :param filter_spec: The filter spec of the rendition, e.g. "width-1400".
+    :return: Rendition - Returns the rendition, or `None` if there is no image.
+    """
+    if not image:
+        return None
+    return renditions.get_rendition(image, filter_spec)
+
+
+@register.simple_tag(takes_context=True)
+def cached_pageurl(context, page):
+    """
+    Outputs the URL of a page, like `{% pageurl page %}`, computed once per request.
+
+    Used as `{% cached_pageurl self.internal_url %}`, every link to the same page
+    within a request shares the URL.
+
+    :param context: The template context.
+    :param page: A page, or None.
+    :return: The URL, or an empty string.
+    """
+    return page_urls.get_page_url(page, request=context.get("request"))
+
+
+@register.simple_tag
+def placeholder_style(rendition):
+    """
+    Renders a style attribute showing the rendition's placeholder until it loads.
+    Used as `<img src="{{ im.url }}"{% placeholder_style im %}>`, this renders
+    nothing unless `OMNI_BLOCKS_IMAGE_PLACEHOLDERS` is set and a placeholder was stored.
+
+    :param rendition: A rendition.
+    :return: The style attribute, with a leading space, or an empty string.
+    """
+    if not placeholders.placeholders_enabled():
+        return ""
+    data_uri = placeholders.get_placeholder(rendition)
+    if not data_uri:
+        return ""
+    return format_html(
+        ' style="background-image: url({}); background-size: cover;"', data_uri
+    )
+
+
+@register.simple_tag
+def prefetch_link_pages(stream_value, specific=False):
+    """
+    Loads the internal pages of every link in a streamfield in one query.
+    Used as `{% prefetch_link_pages page.body as body %}` before rendering `body`.
+
+    :param stream_value: A streamfield value.
+    :param specific: Whether the links need the specific page subclasses.
+    :return: StreamValue - Returns the streamfield value with its links resolved.
+    """
+    return prefetch.prefetch_link_pages(stream_value, specific=specific)
+
+
+@register.simple_tag(takes_context=True)
+def include_prerendered(context, page, field_name):
+    """
+    Renders a page's streamfield, serving the blocks prerendered when it was published.
+    Used as `{% include_prerendered page "body" %}` in place of
+    `{% include_block page.body %}`; blocks that have changed since are rendered as
+    usual.
+
+    :param page: The Page object that contains a streamfield.
+    :param field_name: The name of the streamfield.
+    :return: The rendered streamfield.
+    """
+    return prerender.render_prerendered(page, field_name, context=context.flatten())
@@ -0,0 +1,154 @@
+from __future__ import unicode_literals
+
+import json
+from collections import Counter, defaultdict
+
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import TextField
+from django.db.models.functions import Cast
+from wagtail.core.blocks import ListBlock
+from wagtail.core.fields import StreamField
+from wagtail.core.models import get_page_models
+
+from omni_blocks.walk import walk_raw
+
+
+class Histogram(object):
+    """Distribution of sizes, kept as a count per size so memory stays bounded."""
+
+    def __init__(self):
+        self.counts = Counter()
+
+    def add(self, size):
+        self.counts[size] += 1
+
+    def __len__(self):
+        return sum(self.counts.values())
+
+    def percentile(self, percent):
+        """
+        Get the smallest size at or above the given percentage of the samples.
+
+        :param percent: The percentile, from 0 to 100.
+        :return: The size, or None without samples.
+        """
+        total = len(self)
+        if not total:
+            return None
+        threshold = total * percent / 100.0
+        seen = 0
+        for size in sorted(self.counts):
+            seen += self.counts[size]
+            if seen >= threshold:
+                return size
+        return size
+
+    def summary(self):
+        """Summarise the distribution as its minimum, median, p95 and maximum."""
+        return "min {}, median {}, p95 {}, max {}".format(
+            min(self.counts), self.percentile(50), self.percentile(95), max(self.counts)
+        )
+
+
+class BlockUsage(object):
+    """
+    Usage of the omni_blocks blocks across pages, collected from the raw StreamField
+    data.
+
+    Only counters and histograms are kept, so memory stays bounded however
+    many pages are scanned.
+    """
+
+    def __init__(self):
+        self.page_count = 0
+        self.blocks = Counter()
+        self.pages = Counter()
+        self.lengths = defaultdict(Histogram)
+        self.links = Histogram()
+
+    def add_page(self, streams):
+        """
+        Count the blocks of a page.
+
+        :param streams: Iterable of `(stream block, raw stream data)` for the page's
+            StreamFields.
+        """
+        self.page_count += 1
+        block_types = set()
+        links = 0
+        for stream_block, raw_stream in streams:
+            for block, value in walk_raw(stream_block, raw_stream or []):
+                if not type(block).__module__.startswith("omni_blocks."):
+                    continue
+                name = type(block).__name__
+                self.blocks[name] += 1
+                block_types.add(name)
+                if isinstance(block, ListBlock):
+                    self.lengths[name].add(len(value or []))
+                if name == "LinkBlock" and value and any(value.values()):
+                    links += 1
+        self.pages.update(block_types)
+        self.links.add(links)
+
+    def report(self):
+        """
+        Describe the usage, most used blocks first.
+
+        :return: List of lines.
+        """
+        lines = ["Scanned {} pages.".format(self.page_count)]
+        for name, count in self.blocks.most_common():
+            lines.append(
+                "{}: {} blocks on {} pages".format(name, count, self.pages[name])
+            )
+            if name in self.lengths:
+                lines.append("    length: {}".format(self.lengths[name].summary()))
+        if self.page_count:
+            lines.append("Links per page: {}".format(self.links.summary()))
+        return lines
+
+
+def iter_page_streams(live=False, chunk_size=2000):
+    """
+    Yield the raw StreamField data of every page, one page at a time.
+
+    The fields are read as text, so no StreamValue is built, and pages are
+    fetched in chunks with `.iterator()`, one page type at a time.
+
+    :param live: Whether to only scan live pages.
+    :param chunk_size: Number of pages fetched from the database at a time.
+    :return: Iterator of lists of `(stream block, raw stream data)`.
+    """
+    for model in get_page_models():
+        fields = [
+            field for field in model._meta.get_fields() if isinstance(field, StreamField)
+        ]
+        if not fields:
+            continue
+        aliases = ["_raw_{}".format(field.name) for field in fields]
+        content_type = ContentType.objects.get_for_model(model)
+        casts = {
+            alias: Cast(field.name, TextField()) for alias, field in zip(aliases, fields)
+        }
+        queryset = model.objects.filter(content_type=content_type).annotate(**casts)
+        if live:
+            queryset = queryset.live()
+        for row in queryset.values_list(*aliases).iterator(chunk_size=chunk_size):
+            yield [
+                (field.stream_block, json.loads(raw) if raw else [])
+                for field, raw in zip(fields, row)
+            ]
+
+
+def scan_usage(live=False, chunk_size=2000):
+    """
+    Collect the usage of the omni_blocks blocks across every page.
+
+    :param live: Whether to only scan live pages.
+    :param chunk_size: Number of pages fetched from the database at a time.
+    :return: A BlockUsage.
+    """
+    usage = BlockUsage()
+    for streams in iter_page_streams(live=live, chunk_size=chunk_size):
+        usage.add_page(streams)
+    return usage
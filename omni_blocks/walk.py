@@ -0,0 +1,62 @@
+from __future__ import unicode_literals
+
+from wagtail.core.blocks import BaseStreamBlock, BaseStructBlock, ListBlock
+
+
+def walk_raw(block, value):
+    """
+    Yield `(block, raw value)` for a block and every block nested within it.
+
+    Works on the JSON representation stored in the database, so nothing is
+    converted (and no queries are run) while walking.
+
+    :param block: The block definition.
+    :param value: The raw value of the block.
+    """
+    yield block, value
+    if value is None:
+        return
+
+    if isinstance(block, BaseStreamBlock):
+        for item in value:
+            child_block = block.child_blocks.get(item.get("type"))
+            if child_block is not None:
+                for pair in walk_raw(child_block, item.get("value")):
+                    yield pair
+    elif isinstance(block, BaseStructBlock):
+        for name, child_block in block.child_blocks.items():
+            if name in value:
+                for pair in walk_raw(child_block, value[name]):
+                    yield pair
+    elif isinstance(block, ListBlock):
+        for item in value:
+            for pair in walk_raw(block.child_block, item):
+                yield pair
+
+
+def walk_values(block, value):
+    """
+    Yield `(block, value)` for a block and every block nested within it.
+
+    The native counterpart of `walk_raw`, for values that have already been
+    converted with `to_python`.
+
+    :param block: The block definition.
+    :param value: The native value of the block.
+    """
+    yield block, value
+    if value is None:
+        return
+
+    if isinstance(block, BaseStreamBlock):
+        for child in value:
+            for pair in walk_values(child.block, child.value):
+                yield pair
+    elif isinstance(block, BaseStructBlock):
+        for name, child_block in block.child_blocks.items():
+            for pair in walk_values(child_block, value.get(name)):
+                yield pair
+    elif isinstance(block, ListBlock):
+        for item in value:
+            for pair in walk_values(block.child_block, item):
+                yield pair
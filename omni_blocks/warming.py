@@ -0,0 +1,145 @@
+from __future__ import unicode_literals
+
+import logging
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection, transaction
+from django.dispatch import receiver
+from wagtail.core.models import Page, get_page_models
+from wagtail.core.signals import page_published
+
+from omni_blocks.blocks.mixins import RenditionSpecsMixin
+from omni_blocks.placeholders import placeholders_enabled, store_placeholders
+from omni_blocks.prerender import get_stream_field_names
+from omni_blocks.renditions import get_rendition, prefetch_renditions
+from omni_blocks.walk import walk_values
+
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def warming_enabled():
+    """Whether renditions are warmed on publish, set by `OMNI_BLOCKS_WARM_RENDITIONS`."""
+    return getattr(settings, "OMNI_BLOCKS_WARM_RENDITIONS", False)
+
+
+def get_rendition_workers():
+    """The size of the worker pool, set by `OMNI_BLOCKS_RENDITION_WORKERS`."""
+    return getattr(settings, "OMNI_BLOCKS_RENDITION_WORKERS", 4)
+
+
+def collect_renditions(page):
+    """
+    Collect the renditions the omni_blocks blocks of a page render.
+
+    :param page: The specific page.
+    :return: Dict of image to the set of filter specs rendered for it.
+    """
+    renditions = defaultdict(set)
+    for field_name in get_stream_field_names(page):
+        stream_value = getattr(page, field_name)
+        if stream_value is None:
+            continue
+        for block, value in walk_values(stream_value.stream_block, stream_value):
+            if isinstance(block, RenditionSpecsMixin):
+                for image in block.get_rendition_images(value):
+                    if image:
+                        renditions[image].update(block.rendition_specs)
+    return renditions
+
+
+def warm_renditions(renditions):
+    """
+    Generate the renditions that do not exist yet, and their placeholders if enabled.
+
+    :param renditions: Dict of image to the filter specs to generate for it.
+    """
+    images_by_specs = defaultdict(list)
+    for image, specs in renditions.items():
+        images_by_specs[tuple(sorted(specs))].append(image)
+    for specs, images in images_by_specs.items():
+        prefetch_renditions(images, specs)
+        if placeholders_enabled():
+            store_placeholders(
+                get_rendition(image, spec) for image in images for spec in specs
+            )
+
+
+def warm_page_renditions(page_id):
+    """
+    Generate the renditions the omni_blocks blocks of a page render.
+
+    :param page_id: The id of the page.
+    :return: Dict of image to the set of filter specs rendered for it.
+    """
+    page = Page.objects.filter(pk=page_id).first()
+    if page is None:
+        return {}
+    renditions = collect_renditions(page.specific)
+    warm_renditions(renditions)
+    return renditions
+
+
+def run_in_worker(function, *args, close_connection=True):
+    """
+    Run a function in a pool thread, logging errors and closing its connection after.
+
+    :param function: The function to call.
+    :param close_connection: Whether to close the thread's connection, unset when
+        running in a thread that keeps using its connection.
+    :return: The function's result, or an empty dict if it raised.
+    """
+    try:
+        return function(*args)
+    except Exception:
+        logger.exception("Error warming renditions")
+        return {}
+    finally:
+        if close_connection:
+            connection.close()
+
+
+def get_executor():
+    """Get the worker pool shared by the publish hook, created on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=get_rendition_workers())
+        return _executor
+
+
+def schedule_page_renditions(page_id):
+    """
+    Warm the renditions of a page in the worker pool, off the request path.
+
+    The work starts once the current transaction commits, so the workers see
+    the published page.
+
+    :param page_id: The id of the page.
+    """
+    transaction.on_commit(
+        lambda: get_executor().submit(run_in_worker, warm_page_renditions, page_id)
+    )
+
+
+def get_stream_page_types():
+    """Get the content types of every page model with a StreamField."""
+    return [
+        ContentType.objects.get_for_model(model)
+        for model in get_page_models()
+        if get_stream_field_names(model)
+    ]
+
+
+@receiver(page_published)
+def warm_published_page(sender, instance, **kwargs):
+    """Warm the renditions of a page as it is published."""
+    if warming_enabled():
+        schedule_page_renditions(instance.pk)
@@ -0,0 +1,34 @@
+#!/usr/bin/env python
+# -*- coding: utf-8
+from __future__ import unicode_literals, absolute_import
+
+import os
+import shutil
+import sys
+import tempfile
+
+import django
+from django.conf import settings
+from django.db import connection
+from django.test.utils import setup_test_environment
+
+
+def run_benchmarks(*args):
+    os.environ["DJANGO_SETTINGS_MODULE"] = "tests.settings"
+    django.setup()
+    setup_test_environment()
+
+    media_root = tempfile.mkdtemp()
+    settings.MEDIA_ROOT = media_root
+    connection.creation.create_test_db(verbosity=0)
+    try:
+        from benchmarks.runner import run
+
+        exit_code = run(list(args))
+    finally:
+        shutil.rmtree(media_root)
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    run_benchmarks(*sys.argv[1:])
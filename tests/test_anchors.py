@@ -0,0 +1,42 @@
+from django.test import RequestFactory, TestCase
+
+from omni_blocks.anchors import AnchorAllocator, cached_slugify, get_request_anchors
+
+
+class TestCachedSlugify(TestCase):
+    def test_slugify(self):
+        """Ensure the slug matches django's slugify."""
+        self.assertEqual(cached_slugify("My Cool Link"), "my-cool-link")
+
+    def test_cached(self):
+        """Ensure repeated slugs are served from the cache."""
+        cached_slugify.cache_clear()
+        cached_slugify("Cached Heading")
+        cached_slugify("Cached Heading")
+
+        self.assertEqual(cached_slugify.cache_info().hits, 1)
+
+
+class TestAnchorAllocator(TestCase):
+    def test_allocate_adds_suffixes(self):
+        """Ensure ids already taken get the first free suffix."""
+        allocator = AnchorAllocator()
+
+        self.assertEqual(allocator.allocate("intro"), "intro")
+        self.assertEqual(allocator.allocate("intro"), "intro-2")
+        self.assertEqual(allocator.allocate("intro-3"), "intro-3")
+        self.assertEqual(allocator.allocate("intro"), "intro-4")
+
+    def test_reserve(self):
+        """Ensure reserved ids are not allocated again."""
+        allocator = AnchorAllocator()
+        allocator.reserve("intro")
+        allocator.reserve("intro-2")
+
+        self.assertEqual(allocator.allocate("intro"), "intro-3")
+
+    def test_request_anchors(self):
+        """Ensure a request keeps a single allocator."""
+        request = RequestFactory().get("/")
+
+        self.assertIs(get_request_anchors(request), get_request_anchors(request))
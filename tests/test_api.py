@@ -0,0 +1,107 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from wagtail.core.blocks import StreamBlock
+from wagtail.images.tests.utils import Image, get_test_image_file
+from wagtail_factories import PageFactory, SiteFactory
+
+from omni_blocks.api import StreamFieldSerializer, get_api_representation
+from omni_blocks.blocks.chooser_blocks import PageChooserTemplateBlock
+from omni_blocks.blocks.image_blocks import ImageGridBlock, LinkedImageBlock
+from omni_blocks.blocks.list_blocks import BasicCardGridBlock
+from omni_blocks.blocks.struct_blocks import TitledLinkBlock, TwoColumnBlock
+
+
+class BodyBlock(StreamBlock):
+    images = ImageGridBlock()
+    cards = BasicCardGridBlock()
+    linked_image = LinkedImageBlock()
+    columns = TwoColumnBlock()
+    page = PageChooserTemplateBlock()
+    link = TitledLinkBlock()
+
+
+class TestAPIRepresentation(TestCase):
+    def setUp(self):
+        self.root = PageFactory.create(title="Root", parent=None)
+        SiteFactory.create(root_page=self.root, is_default_site=True)
+        self.page = PageFactory.create(title="Page", slug="page", parent=self.root)
+        self.image = Image.objects.create(title="Test image", file=get_test_image_file())
+        self.block = BodyBlock()
+
+    def get_raw_stream(self, copies):
+        raw_stream = [
+            {"type": "images", "value": [self.image.pk]},
+            {
+                "type": "cards",
+                "value": [
+                    {
+                        "title": "Card",
+                        "image": self.image.pk,
+                        "link": {"internal_url": self.page.pk},
+                    }
+                ],
+            },
+            {
+                "type": "linked_image",
+                "value": {
+                    "image": self.image.pk,
+                    "link": {"internal_url": self.page.pk},
+                },
+            },
+            {
+                "type": "columns",
+                "value": {"left_column": {"image": self.image.pk}, "right_column": {}},
+            },
+            {"type": "page", "value": self.page.pk},
+            {
+                "type": "link",
+                "value": {"title": "Link", "link": {"internal_url": self.page.pk}},
+            },
+        ]
+        return raw_stream * copies
+
+    def test_representation(self):
+        """Ensure pages and images are represented with their URLs."""
+        stream_value = self.block.to_python(self.get_raw_stream(1))
+        representation = get_api_representation(stream_value)
+        images, cards, linked_image, columns, page, link = [
+            child["value"] for child in representation
+        ]
+
+        self.assertEqual(images[0]["id"], self.image.pk)
+        self.assertEqual(
+            set(images[0]["renditions"]), {"width-1400", "fill-420x420-c100"}
+        )
+        card_renditions = cards[0]["image"]["renditions"]
+        self.assertEqual(card_renditions["fill-480x320-c100"]["width"], 480)
+        self.assertEqual(cards[0]["link"]["url"], self.page.url)
+        self.assertIn("width-1600", linked_image["image"]["renditions"])
+        self.assertEqual(linked_image["link"]["url"], self.page.url)
+        self.assertIn("width-800", columns["left_column"]["image"]["renditions"])
+        self.assertIsNone(columns["right_column"]["image"])
+        self.assertEqual(
+            page,
+            {"id": self.page.pk, "title": "Page", "url": self.page.url, "teaser": None},
+        )
+        self.assertEqual(link["link"]["url"], self.page.url)
+
+    def test_fixed_number_of_queries(self):
+        """Ensure the number of queries does not grow with the number of blocks."""
+        get_api_representation(self.block.to_python(self.get_raw_stream(1)))
+
+        counts = []
+        for copies in (1, 5):
+            stream_value = self.block.to_python(self.get_raw_stream(copies))
+            with CaptureQueriesContext(connection) as queries:
+                get_api_representation(stream_value)
+            counts.append(len(queries))
+
+        self.assertEqual(counts[0], counts[1])
+
+    def test_serializer(self):
+        """Ensure the serializer field uses the batched representation."""
+        stream_value = self.block.to_python(self.get_raw_stream(1))
+        representation = StreamFieldSerializer().to_representation(stream_value)
+
+        self.assertEqual(representation[4]["value"]["url"], self.page.url)
@@ -0,0 +1,172 @@
+import asyncio
+import threading
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.test import TestCase
+from wagtail.core.blocks import CharBlock, StreamBlock, StructBlock
+from wagtail.images.tests.utils import Image, get_test_image_file
+from wagtail_factories import PageFactory, SiteFactory
+
+from omni_blocks.async_render import (
+    prefetch_stream_async,
+    render_stream_async,
+    run_in_executor,
+)
+from omni_blocks.blocks.chooser_blocks import PageChooserTemplateBlock
+from omni_blocks.blocks.image_blocks import ImageGridBlock, LinkedImageBlock
+from omni_blocks.blocks.struct_blocks import TitledLinkBlock
+
+
+class InlineExecutor(Executor):
+    """Runs the calls in the test's thread, which holds the test database connection."""
+
+    def submit(self, function, *args, **kwargs):
+        future = Future()
+        future.set_result(function(*args, **kwargs))
+        return future
+
+
+class SectionBlock(StructBlock):
+    title = CharBlock()
+    body = StreamBlock([("images", ImageGridBlock())])
+
+
+class BodyBlock(StreamBlock):
+    images = ImageGridBlock()
+    linked_image = LinkedImageBlock()
+    page = PageChooserTemplateBlock()
+    link = TitledLinkBlock()
+    section = SectionBlock()
+
+
+class TestAsyncRender(TestCase):
+    def setUp(self):
+        root = PageFactory.create(title="Root", parent=None)
+        SiteFactory.create(root_page=root)
+        self.page = PageFactory.create(title="Page", parent=root)
+        self.image = Image.objects.create(title="Test image", file=get_test_image_file())
+        self.block = BodyBlock()
+        self.executor = InlineExecutor()
+
+    def get_stream_value(self):
+        return self.block.to_python(
+            [
+                {"type": "images", "value": [self.image.pk]},
+                {
+                    "type": "linked_image",
+                    "value": {
+                        "image": self.image.pk,
+                        "link": {"internal_url": self.page.pk},
+                    },
+                },
+                {"type": "page", "value": self.page.pk},
+                {
+                    "type": "link",
+                    "value": {"title": "Link", "link": {"internal_url": self.page.pk}},
+                },
+            ]
+        )
+
+    def run_async(self, coroutine):
+        return asyncio.get_event_loop().run_until_complete(coroutine)
+
+    def test_render(self):
+        """Ensure the stream renders the same as it does synchronously."""
+        self.get_stream_value().render_as_block()
+
+        rendered = self.run_async(
+            render_stream_async(self.get_stream_value(), executor=self.executor)
+        )
+
+        self.assertEqual(rendered, self.get_stream_value().render_as_block())
+
+    def test_queries_run_in_executor(self):
+        """Ensure rendering the prefetched stream runs no queries."""
+        self.get_stream_value().render_as_block()
+        stream_value = self.get_stream_value()
+
+        self.run_async(prefetch_stream_async(stream_value, executor=self.executor))
+
+        with self.assertNumQueries(0):
+            stream_value.render_as_block()
+        self.assertEqual(stream_value[2].value, self.page)
+        self.assertEqual(stream_value[1].value["link"]["internal_url"], self.page)
+
+
+class TestAsyncRenderThreadPool(TestCase):
+    """Render with a real thread pool, sharing the test's connection with its thread."""
+
+    def setUp(self):
+        root = PageFactory.create(title="Root", parent=None)
+        SiteFactory.create(root_page=root)
+        self.page = PageFactory.create(title="Page", parent=root)
+        self.image = Image.objects.create(title="Test image", file=get_test_image_file())
+        self.block = BodyBlock()
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(self.executor.shutdown)
+
+        # The worker thread can't see the test's transaction through a connection
+        # of its own, so it is given the test's one, as LiveServerTestCase does
+        wrapper = connections[DEFAULT_DB_ALIAS]
+        wrapper.allow_thread_sharing = True
+        self.addCleanup(setattr, wrapper, "allow_thread_sharing", False)
+        self.executor.submit(connections.__setitem__, DEFAULT_DB_ALIAS, wrapper).result()
+
+    def get_stream_value(self):
+        return self.block.to_python(
+            [
+                {"type": "images", "value": [self.image.pk]},
+                {"type": "page", "value": self.page.pk},
+                {
+                    "type": "section",
+                    "value": {
+                        "title": "Section",
+                        "body": [{"type": "images", "value": [self.image.pk]}],
+                    },
+                },
+            ]
+        )
+
+    def test_no_queries_on_calling_thread(self):
+        """Ensure nested streams are converted, and queried, in the executor."""
+        expected = self.get_stream_value().render_as_block()
+        stream_value = self.get_stream_value()
+        query_threads = []
+
+        def record_thread(execute, sql, params, many, context):
+            query_threads.append(threading.get_ident())
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(record_thread):
+            rendered = asyncio.get_event_loop().run_until_complete(
+                render_stream_async(stream_value, executor=self.executor)
+            )
+
+        self.assertTrue(query_threads)
+        self.assertNotIn(threading.get_ident(), query_threads)
+        self.assertEqual(rendered, expected)
+        self.assertEqual(stream_value[2].value["body"][0].value, [self.image])
+
+
+class TestRunInExecutor(TestCase):
+    def test_closes_connection(self):
+        """Ensure the executor thread's connection is closed after each call."""
+        executor = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(executor.shutdown)
+
+        asyncio.get_event_loop().run_until_complete(
+            run_in_executor(executor, connection.ensure_connection)
+        )
+
+        self.assertIsNone(executor.submit(lambda: connection.connection).result())
+
+    def test_keeps_connection_in_transaction(self):
+        """Ensure a connection in a transaction, like the test's one, is kept open."""
+        connection.ensure_connection()
+
+        asyncio.get_event_loop().run_until_complete(
+            run_in_executor(InlineExecutor(), connection.ensure_connection)
+        )
+
+        self.assertIsNotNone(connection.connection)
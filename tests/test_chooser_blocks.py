@@ -1,5 +1,5 @@
 from django.test import TestCase
-from wagtail.core.blocks import PageChooserBlock
+from wagtail.core.blocks import PageChooserBlock, StreamBlock
 from wagtail_factories import PageFactory, SiteFactory
 
 from omni_blocks.blocks.chooser_blocks import PageChooserTemplateBlock
@@ -30,3 +30,26 @@ class TestPageChooserTemplateBlock(TestCase):
         response = self.block.render_basic("")
 
         self.assertEqual(response, "")
+
+    def test_bulk_to_python_in_stream(self):
+        """Ensure the pages of every block in a stream are loaded together."""
+        pages = [
+            PageFactory.create(parent=None, title="Page {}".format(i)) for i in range(3)
+        ]
+        block = StreamBlock([("page", PageChooserTemplateBlock())])
+        raw_stream = [{"type": "page", "value": page.pk} for page in pages]
+        raw_stream.append({"type": "page", "value": 0})
+        stream_value = block.to_python(raw_stream)
+
+        with self.assertNumQueries(2):
+            # One query for the pages and one for their specific page type
+            values = [child.value for child in stream_value]
+
+        self.assertEqual(values, pages + [None])
+
+    def test_to_python_specific(self):
+        """Ensure a single page is converted to its specific page."""
+        page = PageFactory.create(parent=None, title="foo")
+
+        self.assertEqual(self.block.to_python(page.pk), page)
+        self.assertIsNone(self.block.to_python(None))
@@ -0,0 +1,177 @@
+from django.test import TestCase, override_settings
+from wagtail.images.tests.utils import Image, get_test_image_file
+from wagtail_factories import PageFactory, SiteFactory
+
+from omni_blocks.blocks import chooser_blocks, list_blocks, struct_blocks
+from omni_blocks.fragment_cache import (
+    LRU_TIMEOUT,
+    LRUCache,
+    get_fragment_cache,
+    iter_references,
+)
+
+
+class TestLRUCache(TestCase):
+    def test_evicts_least_recently_used(self):
+        """Ensure the least recently used entry is evicted when the cache is full."""
+        cache = LRUCache(2)
+        cache.set("a", "A")
+        cache.set("b", "B")
+        cache.get("a")
+        cache.set("c", "C")
+
+        self.assertEqual(cache.get("a"), "A")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(len(cache), 2)
+
+    def test_expires(self):
+        """Ensure entries are dropped once their timeout has passed."""
+        cache = LRUCache(2, timeout=0)
+        cache.set("a", "A")
+
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(len(cache), 0)
+
+
+class FragmentCacheTestMixin(object):
+    def setUp(self):
+        root = PageFactory.create(title="home", parent=None)
+        SiteFactory.create(root_page=root)
+        self.page = PageFactory.create(title="Omni Digital", parent=root)
+        self.image = Image.objects.create(title="Test image", file=get_test_image_file())
+        self.block = struct_blocks.BasicCardBlock()
+        self.value = self.block.to_python(
+            {
+                "title": "Card",
+                "description": "Description",
+                "image": self.image.pk,
+                "link": {"internal_url": self.page.pk},
+            }
+        )
+
+    def tearDown(self):
+        fragment_cache = get_fragment_cache()
+        fragment_cache.lru.clear()
+        fragment_cache._versions.clear()
+        if fragment_cache.cache is not None:
+            fragment_cache.cache.clear()
+
+    def test_cached_render(self):
+        """Ensure an unchanged block is only rendered once."""
+        html = self.block.render(self.value)
+        value = self.block.to_python(self.block.get_prep_value(self.value))
+
+        with self.assertNumQueries(0), self.assertTemplateNotUsed(
+            "blocks/basic_card_block.html"
+        ):
+            self.assertEqual(self.block.render(value), html)
+
+    def test_page_save_invalidates(self):
+        """Ensure saving a referenced page renders the block again."""
+        self.block.render(self.value)
+        self.page.slug = "new-slug"
+        self.page.save()
+        value = self.block.to_python(self.block.get_prep_value(self.value))
+
+        self.assertIn("/new-slug/", self.block.render(value))
+
+    def test_rich_text_link_invalidates(self):
+        """Ensure saving a page linked from rich text renders the block again."""
+        block = list_blocks.FlowListBlock()
+        value = block.to_python(
+            [
+                {
+                    "meta_title": "2018",
+                    "body": '<p><a id="{}" linktype="page">Link</a></p>'.format(
+                        self.page.pk
+                    ),
+                }
+            ]
+        )
+        block.render(value)
+        self.page.slug = "new-slug"
+        self.page.save()
+
+        self.assertIn("/new-slug/", block.render(value))
+
+    def test_ancestor_move_invalidates(self):
+        """Ensure renaming the parent of a referenced page renders the block again."""
+        child = PageFactory.create(title="child", parent=self.page)
+        block = chooser_blocks.PageChooserTemplateBlock()
+        block.render(block.to_python(child.pk))
+        self.page.slug = "new-slug"
+        self.page.save()
+
+        self.assertIn("/new-slug/child/", block.render(block.to_python(child.pk)))
+
+    def test_image_save_invalidates(self):
+        """Ensure saving a referenced image renders the block again."""
+        self.block.render(self.value)
+        self.image.save()
+
+        with self.assertTemplateUsed("blocks/basic_card_block.html"):
+            self.block.render(self.value)
+
+
+@override_settings(OMNI_BLOCKS_FRAGMENT_CACHE={"LRU_SIZE": 10})
+class TestInProcessFragmentCache(FragmentCacheTestMixin, TestCase):
+    def test_references(self):
+        """Ensure the pages and images of the value are found."""
+        self.assertEqual(
+            sorted(iter_references(self.value)),
+            sorted(
+                [
+                    ("wagtailcore.page", self.page.pk),
+                    ("wagtailimages.image", self.image.pk),
+                ]
+            ),
+        )
+
+    def test_rich_text_references(self):
+        """Ensure the pages linked and the images embedded in rich text are found."""
+        block = struct_blocks.FlowBlock()
+        value = block.to_python(
+            {
+                "meta_title": "2018",
+                "body": (
+                    '<p><a linktype="page" id="{}">Link</a></p>'
+                    '<embed alt="" embedtype="image" format="left" id="{}"/>'
+                ).format(self.page.pk, self.image.pk),
+            }
+        )
+
+        self.assertEqual(
+            sorted(iter_references(value)),
+            sorted(
+                [
+                    ("wagtailcore.page", self.page.pk),
+                    ("wagtailimages.image", self.image.pk),
+                ]
+            ),
+        )
+
+    def test_fragments_expire(self):
+        """Ensure in-process fragments expire, as other processes miss the saves."""
+        self.assertEqual(get_fragment_cache().lru.timeout, LRU_TIMEOUT)
+
+
+@override_settings(
+    OMNI_BLOCKS_FRAGMENT_CACHE={"CACHE": "fragments", "LRU_SIZE": 0},
+    CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        "fragments": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "fragments",
+        },
+    },
+)
+class TestSharedFragmentCache(FragmentCacheTestMixin, TestCase):
+    def test_fragments_do_not_expire(self):
+        """Ensure in-process fragments are kept, the shared versions invalidate them."""
+        self.assertIsNone(get_fragment_cache().lru.timeout)
+
+
+class TestFragmentCacheDisabled(TestCase):
+    def test_disabled_by_default(self):
+        """Ensure fragment caching is opt-in."""
+        self.assertIsNone(get_fragment_cache())
@@ -1,7 +1,12 @@
 from django.test import TestCase
+from wagtail.core.blocks import StreamBlock
 from wagtail.images.tests.utils import Image, get_test_image_file
 
-from omni_blocks.blocks.image_blocks import LinkedImageBlock
+from omni_blocks.blocks.image_blocks import (
+    ImageGridBlock,
+    LinkedImageBlock,
+    LinkedImageGridBlock,
+)
 
 
 class TestLinkedImageBlock(TestCase):
@@ -18,3 +23,73 @@ class TestLinkedImageBlock(TestCase):
             '<a class="linked_image" href="https://omni-digital.co.uk"><img alt="Test image"',
             block.render(value),
         )
+
+
+class TestImageGridBlock(TestCase):
+    def setUp(self):
+        self.images = [
+            Image.objects.create(title="Test image", file=get_test_image_file())
+            for _ in range(3)
+        ]
+
+    def test_renders(self):
+        """Ensure that every image in the grid renders"""
+        block = ImageGridBlock()
+        rendered = block.render(block.to_python([image.pk for image in self.images]))
+
+        self.assertEqual(rendered.count('<li class="image_grid__item">'), 3)
+        self.assertEqual(rendered.count('aria-label="Test image"'), 3)
+
+    def test_renditions_are_fetched_in_bulk(self):
+        """Ensure that the renditions of the whole grid are fetched in one query"""
+        block = ImageGridBlock()
+        block.render(block.to_python([image.pk for image in self.images]))
+
+        value = block.to_python([image.pk for image in self.images])
+        with self.assertNumQueries(1):
+            block.render(value)
+
+    def test_to_python_in_bulk(self):
+        """Ensure every image in the grid is loaded with one query."""
+        block = ImageGridBlock()
+        pks = [image.pk for image in self.images]
+
+        with self.assertNumQueries(1):
+            value = block.to_python(pks)
+
+        self.assertEqual(value, self.images)
+
+    def test_bulk_to_python_in_stream(self):
+        """Ensure the images of every grid in a stream are loaded with one query."""
+        block = StreamBlock([("grid", ImageGridBlock())])
+        stream_value = block.to_python(
+            [
+                {"type": "grid", "value": [image.pk for image in self.images[:2]]},
+                {"type": "grid", "value": [self.images[2].pk, 0]},
+            ]
+        )
+
+        with self.assertNumQueries(1):
+            grids = [child.value for child in stream_value]
+
+        self.assertEqual(grids, [self.images[:2], [self.images[2], None]])
+
+
+class TestLinkedImageGridBlock(TestCase):
+    def test_renders(self):
+        """Ensure that every linked image in the grid renders"""
+        image = Image.objects.create(title="Test image", file=get_test_image_file())
+        block = LinkedImageGridBlock()
+        item = {
+            "image": image.pk,
+            "link": {"external_url": "https://omni-digital.co.uk"},
+        }
+        value = block.to_python([item] * 2)
+        rendered = block.render(value)
+
+        self.assertEqual(
+            rendered.count(
+                '<a class="linked_image" href="https://omni-digital.co.uk"><img'
+            ),
+            2,
+        )
@@ -0,0 +1,74 @@
+from mock import Mock
+
+from django.test import TestCase
+from wagtail_factories import PageFactory, SiteFactory
+
+from omni_blocks.blocks.list_blocks import BasicCardGridBlock
+from omni_blocks.blocks.struct_blocks import LinkBlock
+from omni_blocks.instrumentation import _state, record_renders
+from omni_blocks.signals import block_rendered
+
+
+class TestRecordRenders(TestCase):
+    def setUp(self):
+        root = PageFactory.create(title="home", parent=None)
+        SiteFactory.create(root_page=root)
+        self.page = PageFactory.create(title="Omni Digital", parent=root)
+        self.block = BasicCardGridBlock()
+        self.value = self.block.to_python(
+            [
+                {
+                    "title": "First",
+                    "link": {"external_url": "https://omni-digital.co.uk"},
+                },
+                {"title": "Second", "link": {"internal_url": self.page.pk}},
+            ]
+        )
+
+    def test_records_nesting_paths(self):
+        """Ensure renders are recorded per block type and nesting path."""
+        with record_renders() as recorder:
+            self.block.render(self.value)
+
+        by_path = recorder.by_path
+        self.assertEqual(by_path["BasicCardGridBlock"]["count"], 1)
+        self.assertEqual(by_path["BasicCardGridBlock > BasicCardBlock"]["count"], 2)
+        self.assertEqual(
+            by_path["BasicCardGridBlock > BasicCardBlock > LinkBlock"]["count"], 2
+        )
+        self.assertEqual(recorder.by_block["LinkBlock"]["count"], 2)
+        self.assertGreater(recorder.by_block["BasicCardGridBlock"]["template_loads"], 0)
+
+    def test_records_queries(self):
+        """Ensure the queries run by a render are attributed to the block."""
+        block = LinkBlock()
+        value = block.to_python({"internal_url": self.page.pk})
+        with record_renders() as recorder:
+            block.render(value)
+
+        self.assertGreater(recorder.by_block["LinkBlock"]["queries"], 0)
+        self.assertEqual(recorder.queries, recorder.by_block["LinkBlock"]["queries"])
+
+    def test_sends_signal(self):
+        """Ensure the block_rendered signal is sent for every render while recording."""
+        receiver = Mock()
+        block_rendered.connect(receiver)
+        try:
+            self.block.render(self.value)
+            receiver.assert_not_called()
+
+            with record_renders():
+                self.block.render(self.value)
+        finally:
+            block_rendered.disconnect(receiver)
+
+        self.assertEqual(receiver.call_count, 5)
+        paths = [call[1]["path"] for call in receiver.call_args_list]
+        self.assertEqual(paths[-1], "BasicCardGridBlock")
+
+    def test_recorder_is_removed(self):
+        """Ensure nothing is recorded once the context manager exits."""
+        with record_renders():
+            pass
+
+        self.assertIsNone(getattr(_state, "recorder", None))
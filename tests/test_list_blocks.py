@@ -1,9 +1,151 @@
+from django.core.exceptions import ValidationError
 from django.test import TestCase
-from wagtail.core.blocks import CharBlock, RichTextBlock
+from django.utils.html import format_html, format_html_join
+from django.utils.safestring import mark_safe
+from wagtail.core.blocks import CharBlock, RichTextBlock, StreamBlock
 from wagtail.images.blocks import ImageChooserBlock
+from wagtail.images.tests.utils import Image, get_test_image_file
+from wagtail_factories import PageFactory
 
-from omni_blocks.blocks.list_blocks import OLBlock, ULBlock
-from omni_blocks.blocks.struct_blocks import FlowBlock, LinkBlock
+from omni_blocks.blocks.list_blocks import (
+    BasicCardGridBlock,
+    FlowListBlock,
+    OLBlock,
+    ULBlock,
+)
+from omni_blocks.blocks.struct_blocks import BasicCardBlock, FlowBlock, LinkBlock
+
+
+class TestBasicCardGridBlock(TestCase):
+    """Tests for the BasicCardGridBlock."""
+
+    def test_renders(self):
+        """Ensure every card in the grid renders with its own values."""
+        block = BasicCardGridBlock()
+        value = block.to_python(
+            [
+                {
+                    "title": "First",
+                    "link": {"external_url": "https://omni-digital.co.uk"},
+                },
+                {"title": "Second", "link": {"external_url": "https://example.com"}},
+            ]
+        )
+        rendered = block.render(value)
+
+        self.assertIn('<h2 class="basic_card_grid__title">First</h2>', rendered)
+        self.assertIn('<h2 class="basic_card_grid__title">Second</h2>', rendered)
+        self.assertIn('href="https://example.com"', rendered)
+
+    def test_render_stream(self):
+        """Ensure the streamed chunks add up to the rendered block, a chunk per card."""
+        block = BasicCardGridBlock()
+        value = block.to_python([{"title": "Card {}".format(i)} for i in range(5)])
+        chunks = list(block.render_stream(value))
+
+        self.assertEqual(len(chunks), 7)
+        self.assertIn("Card 3", chunks[4])
+        self.assertEqual("".join(chunks), block.render(value))
+
+
+class TestBasicCardGridBlockClean(TestCase):
+    def setUp(self):
+        root = PageFactory.create(title="home", parent=None)
+        self.pages = [
+            PageFactory.create(title="Page {}".format(i), parent=root) for i in range(3)
+        ]
+        self.images = [
+            Image.objects.create(title="Image {}".format(i), file=get_test_image_file())
+            for i in range(3)
+        ]
+        self.block = BasicCardGridBlock()
+
+    def test_to_python_in_bulk(self):
+        """Ensure the pages and images of every card are loaded with one query each."""
+        with self.assertNumQueries(2):
+            value = self.block.to_python(
+                [
+                    {
+                        "title": "Card",
+                        "image": image.pk,
+                        "link": {"internal_url": page.pk},
+                    }
+                    for page, image in zip(self.pages, self.images)
+                ]
+            )
+
+        self.assertEqual([card["link"]["internal_url"] for card in value], self.pages)
+        self.assertEqual([card["image"] for card in value], self.images)
+
+    def test_clean_in_bulk(self):
+        """Ensure the pages and images of every card are validated with a query each."""
+        value = self.block.to_python(
+            [
+                {"title": "Card", "image": image.pk, "link": {"internal_url": page.pk}}
+                for page, image in zip(self.pages, self.images)
+            ]
+        )
+
+        with self.assertNumQueries(2):
+            cleaned = self.block.clean(value)
+
+        self.assertEqual([card["link"]["internal_url"] for card in cleaned], self.pages)
+        self.assertEqual([card["image"] for card in cleaned], self.images)
+
+    def test_value_from_datadict_in_bulk(self):
+        """Ensure the pages and images posted by the admin are loaded together."""
+        data = {"cards-count": str(len(self.pages))}
+        for i, (page, image) in enumerate(zip(self.pages, self.images)):
+            prefix = "cards-{}".format(i)
+            data.update(
+                {
+                    prefix + "-deleted": "",
+                    prefix + "-order": str(i),
+                    prefix + "-value-title": "Card",
+                    prefix + "-value-image": str(image.pk),
+                    prefix + "-value-link-external_url": "",
+                    prefix + "-value-link-internal_url": str(page.pk),
+                    prefix + "-value-description": "",
+                }
+            )
+
+        with self.assertNumQueries(2):
+            value = self.block.value_from_datadict(data, {}, "cards")
+
+        self.assertEqual([card["link"]["internal_url"] for card in value], self.pages)
+        self.assertEqual([card["image"] for card in value], self.images)
+
+    def test_clean_errors_unchanged(self):
+        """Ensure each card reports the same errors as when cleaned on its own."""
+        cards = [
+            {
+                "title": "Both",
+                "link": {
+                    "internal_url": self.pages[0].pk,
+                    "external_url": "https://a.b",
+                },
+            },
+            {"title": "Missing", "link": {"internal_url": self.pages[1].pk}},
+        ]
+        value = self.block.to_python(cards)
+        # The page is deleted after the value is loaded, so it no longer validates
+        self.pages[1].delete()
+
+        with self.assertRaises(ValidationError) as bulk:
+            self.block.clean(value)
+
+        for error_list, card in zip(bulk.exception.params, value):
+            error = error_list.as_data()[0]
+            with self.assertRaises(ValidationError) as single:
+                BasicCardBlock().clean(card)
+            self.assertEqual(error.messages, single.exception.messages)
+            self.assertEqual(
+                {name: list(field_error) for name, field_error in error.params.items()},
+                {
+                    name: list(field_error)
+                    for name, field_error in single.exception.params.items()
+                },
+            )
 
 
 class TestULBlock(TestCase):
@@ -17,6 +159,31 @@ class TestULBlock(TestCase):
             block.render_basic(("1", "2", "3", "4")),
         )
 
+    def test_render_basic_escapes(self):
+        """Ensure each item is escaped, unless it is already safe."""
+        block = ULBlock()
+        self.assertEqual(
+            '<ul class="written_content_list">'
+            "<li>&lt;b&gt;</li>\n<li><i>safe</i></li></ul>",
+            block.render_basic(("<b>", mark_safe("<i>safe</i>"))),
+        )
+
+    def test_render_basic_matches_format_html_join(self):
+        """Ensure the output matches the format_html_join implementation."""
+        block = ULBlock()
+        value = ["item & {}".format(i) for i in range(100)] + ['"quoted"']
+        children = format_html_join("\n", "<li>{0}</li>", ((item,) for item in value))
+        expected = format_html('<ul class="written_content_list">{0}</ul>', children)
+
+        self.assertEqual(expected, block.render_basic(value))
+
+    def test_render_basic_empty(self):
+        """Ensure an empty list renders an empty list element."""
+        block = ULBlock()
+        self.assertEqual(
+            '<ul class="written_content_list"></ul>', block.render_basic([])
+        )
+
 
 class TestOLBlock(TestCase):
     """Tests for the OLBlock."""
@@ -88,3 +255,53 @@ class TestFlowBlock(TestCase):
         self.assertIn("Main Title", response)
         self.assertIn("This is the body.", response)
         self.assertIn("https://omni-digital.co.uk", response)
+
+
+class TestFlowListBlock(TestCase):
+    def test_render_stream(self):
+        """Ensure the streamed chunks add up to the rendered block."""
+        block = FlowListBlock()
+        value = block.to_python(
+            [{"meta_title": "Meta {}".format(i), "title": "Title"} for i in range(3)]
+        )
+        chunks = list(block.render_stream(value))
+
+        self.assertEqual(len(chunks), 5)
+        self.assertIn("Meta 1", chunks[2])
+        self.assertEqual("".join(chunks), block.render(value))
+
+
+class TestSharedChildBlocks(TestCase):
+    """Tests for the child definitions shared by the list blocks."""
+
+    def test_child_is_shared(self):
+        """Ensure every list of a type shares the same child definition."""
+        self.assertIs(BasicCardGridBlock().child_block, BasicCardGridBlock().child_block)
+        self.assertIs(ULBlock().child_block, OLBlock().child_block)
+
+    def test_stream_blocks_share_child(self):
+        """Ensure the lists of a StreamBlock share the child definition."""
+
+        class BodyBlock(StreamBlock):
+            cards = BasicCardGridBlock()
+            more_cards = BasicCardGridBlock()
+
+        child_blocks = BodyBlock().child_blocks
+
+        cards_child = child_blocks["cards"].child_block
+        self.assertIs(cards_child, BasicCardGridBlock().child_block)
+        self.assertIs(child_blocks["more_cards"].child_block, cards_child)
+        self.assertEqual(child_blocks["cards"].name, "cards")
+        self.assertEqual(child_blocks["more_cards"].name, "more_cards")
+
+    def test_deconstruct(self):
+        """Ensure the deconstructed block is computed once and still compares equal."""
+        block = FlowListBlock(label="Flow")
+
+        self.assertIs(block.deconstruct(), block.deconstruct())
+        self.assertEqual(
+            block.deconstruct(),
+            ("omni_blocks.blocks.list_blocks.FlowListBlock", (), {"label": "Flow"}),
+        )
+        self.assertEqual(block, FlowListBlock(label="Flow"))
+        self.assertNotEqual(block, FlowListBlock(label="Other"))
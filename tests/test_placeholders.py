@@ -0,0 +1,77 @@
+from django.test import TestCase, override_settings
+from wagtail.images.tests.utils import Image, get_test_image_file
+
+from omni_blocks import placeholders
+from omni_blocks.blocks.image_blocks import ImageGridBlock
+from omni_blocks.models import RenditionPlaceholder
+from omni_blocks.renditions import get_rendition
+from omni_blocks.warming import warm_renditions
+
+
+@override_settings(OMNI_BLOCKS_IMAGE_PLACEHOLDERS=True)
+class TestPlaceholders(TestCase):
+    def setUp(self):
+        self.images = [
+            Image.objects.create(title="Test image", file=get_test_image_file())
+            for _ in range(2)
+        ]
+
+    def test_store_placeholders(self):
+        """Ensure a placeholder is stored once for every rendition."""
+        renditions = [get_rendition(image, "fill-420x420-c100") for image in self.images]
+        placeholders.store_placeholders(renditions)
+        placeholders.store_placeholders(renditions)
+
+        self.assertEqual(RenditionPlaceholder.objects.count(), 2)
+        data_uri = RenditionPlaceholder.objects.first().data_uri
+        self.assertTrue(data_uri.startswith("data:image/png;base64,"))
+
+    def test_warming_stores_placeholders(self):
+        """Ensure warming the renditions stores their placeholders."""
+        warm_renditions({self.images[0]: {"width-800", "fill-420x420-c100"}})
+
+        self.assertEqual(RenditionPlaceholder.objects.count(), 2)
+
+    def test_render_placeholders(self):
+        """Ensure the grid inlines the stored placeholders, loaded with one query."""
+        warm_renditions(
+            {image: {"width-1400", "fill-420x420-c100"} for image in self.images}
+        )
+        block = ImageGridBlock()
+        value = block.to_python([image.pk for image in self.images])
+
+        with self.assertNumQueries(2):
+            # One query for the renditions and one for their placeholders
+            rendered = block.render(value)
+
+        self.assertEqual(rendered.count('width="420" height="420" loading="lazy"'), 2)
+        self.assertEqual(
+            rendered.count('style="background-image: url(data:image/png;base64,'), 2
+        )
+
+    def test_render_without_placeholders(self):
+        """Ensure renditions without a placeholder render without a style."""
+        block = ImageGridBlock()
+        rendered = block.render(block.to_python([image.pk for image in self.images]))
+
+        self.assertEqual(rendered.count('loading="lazy"'), 2)
+        self.assertNotIn("background-image", rendered)
+        self.assertFalse(RenditionPlaceholder.objects.exists())
+
+    @override_settings(OMNI_BLOCKS_IMAGE_PLACEHOLDERS=False)
+    def test_disabled(self):
+        """Ensure placeholders are not rendered unless enabled."""
+        with self.settings(OMNI_BLOCKS_IMAGE_PLACEHOLDERS=True):
+            warm_renditions({self.images[0]: {"fill-420x420-c100"}})
+        block = ImageGridBlock()
+        rendered = block.render(block.to_python([self.images[0].pk]))
+
+        self.assertNotIn("background-image", rendered)
+
+    def test_delete_rendition(self):
+        """Ensure the placeholder of a deleted rendition is deleted."""
+        rendition = get_rendition(self.images[0], "fill-420x420-c100")
+        placeholders.store_placeholders([rendition])
+        rendition.delete()
+
+        self.assertFalse(RenditionPlaceholder.objects.exists())
@@ -0,0 +1,90 @@
+from django.test import TestCase
+from wagtail.core.blocks import StreamBlock
+from wagtail_factories import PageFactory, SiteFactory
+
+from omni_blocks.blocks.list_blocks import BasicCardGridBlock, FlowListBlock
+from omni_blocks.blocks.struct_blocks import ButtonBlock, LinkBlock, TitledLinkBlock
+from omni_blocks.prefetch import prefetch_link_pages
+
+
+class BodyBlock(StreamBlock):
+    link = LinkBlock()
+    titled_link = TitledLinkBlock()
+    button = ButtonBlock()
+    cards = BasicCardGridBlock()
+    flow = FlowListBlock()
+
+
+class TestPrefetchLinkPages(TestCase):
+    def setUp(self):
+        root = PageFactory.create(title="home", parent=None)
+        self.site = SiteFactory.create(root_page=root)
+        self.pages = [
+            PageFactory.create(title="Page {}".format(i), parent=root) for i in range(4)
+        ]
+        self.block = BodyBlock()
+
+    def get_stream_value(self):
+        first, second, third, fourth = [{"internal_url": page.pk} for page in self.pages]
+        return self.block.to_python(
+            [
+                {"type": "link", "value": first},
+                {"type": "titled_link", "value": {"title": "Title", "link": second}},
+                {"type": "button", "value": {"title": "Button", "link": third}},
+                {
+                    "type": "cards",
+                    "value": [
+                        {"title": "Card", "link": fourth},
+                        {"title": "Card", "link": first},
+                    ],
+                },
+                {"type": "flow", "value": [{"meta_title": "Meta", "link": second}]},
+            ]
+        )
+
+    def test_prefetch_uses_one_query(self):
+        """Ensure the pages of every link in the stream are loaded with one query."""
+        stream_value = self.get_stream_value()
+        with self.assertNumQueries(1):
+            prefetch_link_pages(stream_value)
+
+        with self.assertNumQueries(0):
+            links = [
+                stream_value[0].value,
+                stream_value[1].value["link"],
+                stream_value[2].value["link"],
+                stream_value[3].value[0]["link"],
+                stream_value[3].value[1]["link"],
+                stream_value[4].value[0]["link"],
+            ]
+        self.assertEqual(
+            [link["internal_url"] for link in links],
+            [
+                self.pages[0],
+                self.pages[1],
+                self.pages[2],
+                self.pages[3],
+                self.pages[0],
+                self.pages[1],
+            ],
+        )
+
+    def test_prefetched_stream_renders(self):
+        """Ensure the prefetched links render their urls."""
+        stream_value = prefetch_link_pages(self.get_stream_value())
+        rendered = stream_value.render_as_block()
+
+        self.assertIn(self.pages[2].url, rendered)
+
+    def test_missing_pages_resolve_to_none(self):
+        """Ensure links to pages that no longer exist resolve to None."""
+        stream_value = self.block.to_python(
+            [{"type": "link", "value": {"internal_url": 9999}}]
+        )
+        prefetch_link_pages(stream_value)
+
+        self.assertIsNone(stream_value[0].value["internal_url"])
+
+    def test_non_stream_values_are_returned(self):
+        """Ensure values other than StreamValues are returned unchanged."""
+        self.assertEqual(prefetch_link_pages([]), [])
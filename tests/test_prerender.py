@@ -0,0 +1,159 @@
+from django.test import TestCase, override_settings
+from mock import patch
+from wagtail.core.blocks import CharBlock, RichTextBlock, StreamBlock
+from wagtail_factories import PageFactory, SiteFactory
+
+from omni_blocks import prerender
+from omni_blocks.blocks.struct_blocks import LinkBlock
+from omni_blocks.blocks.text_blocks import JumpHBlock
+from omni_blocks.models import PrerenderedBlock
+
+
+class CustomBlock(CharBlock):
+    pass
+
+
+class PrerenderedCustomBlock(CharBlock):
+    prerender = True
+
+
+class BodyBlock(StreamBlock):
+    link = LinkBlock()
+    rich_text = RichTextBlock()
+    heading = JumpHBlock("h2")
+    custom = CustomBlock()
+    prerendered_custom = PrerenderedCustomBlock()
+
+
+@override_settings(OMNI_BLOCKS_PRERENDER=True)
+class TestPrerender(TestCase):
+    def setUp(self):
+        root = PageFactory.create(title="home", parent=None)
+        SiteFactory.create(root_page=root)
+        self.target = PageFactory.create(title="Target", parent=root)
+        self.page = PageFactory.create(title="Page", parent=root)
+        self.revision = self.page.save_revision()
+        self.page.live_revision = self.revision
+        self.page.save()
+        self.block = BodyBlock()
+        self.raw = [
+            {"type": "link", "value": {"internal_url": self.target.pk}, "id": "1"},
+            {"type": "heading", "value": "Intro", "id": "2"},
+        ]
+        prerender.prerender_stream(self.revision, "body", self.block.to_python(self.raw))
+
+    def render(self, raw=None):
+        self.page.body = self.block.to_python(raw or self.raw)
+        return prerender.render_prerendered(self.page, "body")
+
+    def test_prerender_stream(self):
+        """Ensure the blocks are stored, except headings depending on the request."""
+        block = PrerenderedBlock.objects.get()
+
+        self.assertEqual(
+            (block.field_name, block.position, block.block_type), ("body", 0, "link")
+        )
+        self.assertEqual(block.html, self.target.url)
+        self.assertEqual(
+            list(block.references.values_list("label", "object_id")),
+            [("wagtailcore.page", str(self.target.pk))],
+        )
+
+    def test_custom_blocks_opt_in(self):
+        """Ensure blocks from other apps than omni_blocks and Wagtail have to opt in."""
+        PrerenderedBlock.objects.all().delete()
+        raw = [
+            {"type": "custom", "value": "Custom", "id": "1"},
+            {"type": "prerendered_custom", "value": "Opted in", "id": "2"},
+        ]
+
+        prerender.prerender_stream(self.revision, "body", self.block.to_python(raw))
+
+        self.assertEqual(PrerenderedBlock.objects.get().html, "Opted in")
+
+    def test_prerender_page_site_request(self):
+        """Ensure links are rendered relative to the page's site, as they are live."""
+        self.page.body = self.block.to_python(self.raw)
+        with patch.object(prerender, "get_stream_field_names", return_value=["body"]):
+            prerender.prerender_page(self.page, self.revision)
+
+        url = self.target.relative_url(self.page.get_site())
+        self.assertEqual(PrerenderedBlock.objects.get().html, url)
+        self.assertNotEqual(url, self.target.url)
+
+    def test_render_prerendered(self):
+        """Ensure the stored blocks are served with a single query."""
+        expected = self.block.render(self.block.to_python(self.raw))
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.render(), expected)
+
+    def test_stale_reference(self):
+        """Ensure blocks showing a page that has changed are rendered again."""
+        self.target.slug = "moved"
+        self.target.save()
+
+        self.assertTrue(PrerenderedBlock.objects.get().stale)
+        self.assertIn("/moved/", self.render())
+
+    def test_stale_rich_text_reference(self):
+        """Ensure blocks linking to a page from rich text are rendered again."""
+        PrerenderedBlock.objects.all().delete()
+        raw = [
+            {
+                "type": "rich_text",
+                "value": '<p><a linktype="page" id="{}">Target</a></p>'.format(
+                    self.target.pk
+                ),
+                "id": "1",
+            }
+        ]
+        prerender.prerender_stream(self.revision, "body", self.block.to_python(raw))
+        self.target.slug = "moved"
+        self.target.save()
+
+        self.assertTrue(PrerenderedBlock.objects.get().stale)
+        self.assertIn("/moved/", self.render(raw))
+
+    def test_stale_ancestor(self):
+        """Ensure blocks showing a page are rendered again when its parent moves."""
+        PrerenderedBlock.objects.all().delete()
+        child = PageFactory.create(title="child", parent=self.target)
+        raw = [{"type": "link", "value": {"internal_url": child.pk}, "id": "1"}]
+        prerender.prerender_stream(self.revision, "body", self.block.to_python(raw))
+        self.target.slug = "moved"
+        self.target.save()
+
+        self.assertTrue(PrerenderedBlock.objects.get().stale)
+        self.assertIn("/moved/child/", self.render(raw))
+
+    def test_changed_content(self):
+        """Ensure blocks that no longer match the field's content are rendered again."""
+        raw = [
+            {
+                "type": "link",
+                "value": {"external_url": "https://omni-digital.co.uk"},
+                "id": "1",
+            }
+        ]
+
+        self.assertIn("https://omni-digital.co.uk", self.render(raw))
+
+    def test_prerender_page_replaces_older_renders(self):
+        """Ensure publishing a page replaces the blocks stored for earlier revisions."""
+        revision = self.page.save_revision()
+        self.page.body = self.block.to_python(self.raw)
+        with patch.object(prerender, "get_stream_field_names", return_value=["body"]):
+            prerender.prerender_page(self.page, revision)
+
+        self.assertEqual(
+            list(PrerenderedBlock.objects.values_list("revision", flat=True)),
+            [revision.pk],
+        )
+
+    @override_settings(OMNI_BLOCKS_PRERENDER=False)
+    def test_disabled(self):
+        """Ensure nothing is marked stale unless prerendering is enabled."""
+        self.target.save()
+
+        self.assertFalse(PrerenderedBlock.objects.get().stale)
@@ -0,0 +1,118 @@
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils.six import StringIO
+from mock import patch
+from wagtail.core.blocks import StreamBlock
+from wagtail.core.models import Page
+from wagtail.images.tests.utils import Image, get_test_image_file
+from wagtail_factories import PageFactory
+
+from omni_blocks import references, warming
+from omni_blocks.blocks.chooser_blocks import PageChooserTemplateBlock
+from omni_blocks.blocks.image_blocks import ImageGridBlock
+from omni_blocks.blocks.list_blocks import BasicCardGridBlock
+from omni_blocks.models import BlockReference
+from omni_blocks.signals import referenced_object_changed
+
+
+class BodyBlock(StreamBlock):
+    images = ImageGridBlock()
+    cards = BasicCardGridBlock()
+    page = PageChooserTemplateBlock()
+
+
+@override_settings(OMNI_BLOCKS_REFERENCE_INDEX=True)
+class TestReferenceIndex(TestCase):
+    def setUp(self):
+        self.target = PageFactory.create(title="Target", parent=None)
+        self.image = Image.objects.create(title="Test image", file=get_test_image_file())
+        self.page = PageFactory.create(title="Page", parent=None)
+        self.page.body = BodyBlock().to_python(
+            [
+                {"type": "images", "value": [self.image.pk, self.image.pk]},
+                {
+                    "type": "cards",
+                    "value": [
+                        {
+                            "title": "Card",
+                            "image": None,
+                            "link": {"internal_url": self.target.pk},
+                        }
+                    ],
+                },
+                {"type": "page", "value": self.target.pk},
+            ]
+        )
+        patcher = patch.object(
+            references, "get_stream_field_names", return_value=["body"]
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_index_page(self):
+        """Ensure chosen pages and images are indexed once per block type, unqueried."""
+        with self.assertNumQueries(0):
+            page_references = references.get_page_references(self.page)
+
+        self.assertEqual(
+            [(ref.block_type, ref.label, ref.object_id) for ref in page_references],
+            [
+                ("BulkImageChooserBlock", "wagtailimages.image", str(self.image.pk)),
+                ("BulkPageChooserBlock", "wagtailcore.page", str(self.target.pk)),
+                ("PageChooserTemplateBlock", "wagtailcore.page", str(self.target.pk)),
+            ],
+        )
+
+    def test_save_indexes_page(self):
+        """Ensure saving the page replaces its references, but saving a draft doesn't."""
+        self.page.save()
+        self.assertEqual(BlockReference.objects.filter(page=self.page).count(), 3)
+
+        self.page.body = BodyBlock().to_python([])
+        self.page.save(update_fields=["title"])
+        self.assertEqual(BlockReference.objects.filter(page=self.page).count(), 3)
+
+        self.page.save()
+        self.assertFalse(BlockReference.objects.exists())
+
+    def test_get_referencing_pages(self):
+        """Ensure the pages referencing a page or image are found."""
+        references.index_page(self.page)
+
+        self.assertEqual(
+            list(references.get_referencing_pages(self.target)), [self.page]
+        )
+        self.assertEqual(list(references.get_referencing_pages(self.image)), [self.page])
+        self.assertEqual(list(references.get_referencing_pages(self.page)), [])
+
+    def test_referenced_object_changed(self):
+        """Ensure the referencing pages are sent as a referenced image is saved."""
+        references.index_page(self.page)
+        received = []
+
+        def receiver(sender, instance, pages, **kwargs):
+            received.append((instance, list(pages)))
+
+        referenced_object_changed.connect(receiver)
+        self.addCleanup(referenced_object_changed.disconnect, receiver)
+        self.image.title = "Replaced"
+        self.image.save()
+
+        self.assertEqual(received, [(self.image, [self.page])])
+
+    def test_rebuild_command(self):
+        """Ensure the command indexes every page with a StreamField."""
+        page_type = self.page.content_type
+        stdout = StringIO()
+        with patch.object(
+            warming, "get_stream_page_types", return_value=[page_type]
+        ), patch.object(
+            references, "index_page", return_value=[BlockReference()]
+        ) as index_page:
+            call_command("rebuild_block_references", stdout=stdout)
+
+        self.assertEqual(index_page.call_count, Page.objects.count())
+        self.assertIn(
+            "Indexed {0} references across {0} pages.".format(index_page.call_count),
+            stdout.getvalue(),
+        )
@@ -0,0 +1,47 @@
+from django.test import TestCase
+from wagtail.images.tests.utils import Image, get_test_image_file
+
+from omni_blocks.renditions import get_rendition, prefetch_renditions
+
+
+class TestPrefetchRenditions(TestCase):
+    def setUp(self):
+        self.images = [
+            Image.objects.create(title="Image {}".format(i), file=get_test_image_file())
+            for i in range(3)
+        ]
+        for image in self.images:
+            image.get_rendition("width-400")
+
+    def test_prefetch_uses_one_query(self):
+        """Ensure existing renditions for every image are fetched in a single query."""
+        images = list(Image.objects.filter(pk__in=[image.pk for image in self.images]))
+        with self.assertNumQueries(1):
+            prefetch_renditions(images, ["width-400"])
+
+        with self.assertNumQueries(0):
+            for image in images:
+                rendition = get_rendition(image, "width-400")
+                self.assertEqual(rendition.filter_spec, "width-400")
+                self.assertEqual(rendition.alt, image.title)
+
+    def test_prefetch_shares_renditions_between_instances(self):
+        """Ensure every instance of an image chosen several times gets the renditions."""
+        images = [Image.objects.get(pk=self.images[0].pk) for _ in range(3)]
+        prefetch_renditions(images, ["width-400"])
+
+        with self.assertNumQueries(0):
+            for image in images:
+                get_rendition(image, "width-400")
+
+    def test_prefetch_generates_missing_renditions(self):
+        """Ensure renditions that do not exist yet are generated."""
+        prefetch_renditions(self.images, ["width-200"])
+
+        for image in self.images:
+            self.assertTrue(image.renditions.filter(filter_spec="width-200").exists())
+
+    def test_prefetch_skips_empty_images(self):
+        """Ensure missing images are ignored."""
+        with self.assertNumQueries(0):
+            prefetch_renditions([None, None], ["width-400"])
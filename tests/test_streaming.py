@@ -0,0 +1,52 @@
+from django.http import StreamingHttpResponse
+from django.test import TestCase
+from wagtail.core.blocks import StreamBlock
+
+from omni_blocks.blocks.list_blocks import BasicCardGridBlock
+from omni_blocks.blocks.struct_blocks import ButtonBlock
+from omni_blocks.streaming import render_stream
+
+
+class BodyBlock(StreamBlock):
+    button = ButtonBlock()
+    cards = BasicCardGridBlock()
+
+
+class TestRenderStream(TestCase):
+    def setUp(self):
+        self.block = BodyBlock()
+        self.value = self.block.to_python(
+            [
+                {
+                    "type": "button",
+                    "value": {
+                        "title": "Button",
+                        "link": {"external_url": "https://example.com"},
+                    },
+                },
+                {
+                    "type": "cards",
+                    "value": [{"title": "Card {}".format(i)} for i in range(3)],
+                },
+            ]
+        )
+
+    def test_matches_render(self):
+        """Ensure the streamed chunks add up to the rendered stream."""
+        self.assertEqual(
+            "".join(render_stream(self.value)), self.value.render_as_block()
+        )
+
+    def test_streams_list_children(self):
+        """Ensure each child of a streaming list block is its own chunk."""
+        chunks = list(render_stream(self.value))
+
+        titles = [chunk for chunk in chunks if "basic_card_grid__title" in chunk]
+        self.assertEqual(len(titles), 3)
+
+    def test_streaming_http_response(self):
+        """Ensure the generator can be used as streaming response content."""
+        response = StreamingHttpResponse(render_stream(self.value))
+        content = b"".join(response.streaming_content).decode()
+
+        self.assertEqual(content, self.value.render_as_block())
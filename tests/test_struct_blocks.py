@@ -1,7 +1,9 @@
 from django.core.exceptions import ValidationError
-from django.test import TestCase
+from django.test import RequestFactory, TestCase
 from django.utils.crypto import get_random_string
+from mock import patch
 from wagtail.core.blocks import StructBlock
+from wagtail.core.models import Page
 from wagtail.images.tests.utils import Image, get_test_image_file
 from wagtail_factories import PageFactory, SiteFactory
 
@@ -57,6 +59,50 @@ class TestColumnBlock(TestCase):
         self.assertIn(val, str(data[key]))
 
 
+class TestGoogleMapBlock(TestCase):
+    def setUp(self):
+        self.block = struct_blocks.GoogleMapBlock()
+        self.value = self.block.to_python(
+            {"latitude": "51.5074", "longitude": "-0.1278", "zoom_level": "12"}
+        )
+
+    def test_renders_config(self):
+        """Ensure the map is rendered as a container holding its config."""
+        html = self.block.render(self.value)
+
+        self.assertIn('data-latitude="51.5074"', html)
+        self.assertIn('data-longitude="-0.1278"', html)
+        self.assertIn('data-zoom="12"', html)
+
+    def test_script_once_per_request(self):
+        """Ensure the maps script is only output by the first map of a request."""
+        context = {"request": RequestFactory().get("/")}
+        first = self.block.render(self.value, context=context)
+        second = self.block.render(self.value, context=context)
+
+        self.assertEqual(first.count("<script>"), 1)
+        self.assertNotIn("<script>", second)
+        self.assertNotIn("maps.googleapis.com/maps/api/js", second)
+
+
+class TestTwoColumnBlock(TestCase):
+    def test_renders(self):
+        """Ensure both columns are rendered through the column template."""
+        block = struct_blocks.TwoColumnBlock()
+        value = block.to_python(
+            {
+                "left_column": {"paragraph": "<p>Left</p>"},
+                "right_column": {"paragraph": "<p>Right</p>"},
+            }
+        )
+
+        with self.assertTemplateUsed("blocks/column_block.html", count=2):
+            html = block.render(value)
+
+        self.assertEqual(html.count('<div class="two_item_block__block">'), 2)
+        self.assertLess(html.index("<p>Left</p>"), html.index("<p>Right</p>"))
+
+
 class TestLinkBlock(TestCase):
     def setUp(self):
         self.block = struct_blocks.LinkBlock()
@@ -77,6 +123,63 @@ class TestLinkBlock(TestCase):
 
         self.assertEqual(value, "{}/omni-digital/".format(self.site.root_url))
 
+    def test_internal_url_once_per_request(self):
+        """Ensure each page's URL is computed once per request, relative to its site."""
+        request = RequestFactory().get("/")
+        request.site = self.site
+        template_block = struct_blocks.LinkBlock(template="blocks/link_block.html")
+        value = {"internal_url": self.page}
+
+        context = {"request": request}
+        with patch.object(
+            Page, "get_url", autospec=True, return_value="/omni-digital/"
+        ) as get_url:
+            rendered = [
+                self.block.render(value, context=context),
+                template_block.render(value, context=context),
+                self.block.render({"internal_url": self.page}, context=context),
+            ]
+
+        self.assertEqual(rendered, ["/omni-digital/"] * 3)
+        get_url.assert_called_once_with(self.page, request=request)
+
+    def test_internal_url_relative_to_request(self):
+        """Ensure the URL is relative when the page is on the request's site."""
+        request = RequestFactory().get("/")
+        request.site = self.site
+
+        rendered = self.block.render(
+            {"internal_url": self.page}, context={"request": request}
+        )
+
+        self.assertEqual(rendered, "/omni-digital/")
+
+    def test_renders_without_template(self):
+        """Ensure the block renders the escaped URL without using a template."""
+        value = self.block.to_python(
+            {"external_url": "https://omni-digital.co.uk/?a=1&b=2"}
+        )
+        with self.assertTemplateNotUsed(template_name="blocks/link_block.html"):
+            content = self.block.render(value)
+
+        self.assertEqual("https://omni-digital.co.uk/?a=1&amp;b=2", content)
+
+    def test_renders_empty_link(self):
+        """Ensure an empty link renders an empty string."""
+        unrequired_block = struct_blocks.LinkBlock(required=False)
+        value = unrequired_block.to_python({})
+
+        self.assertEqual("", unrequired_block.render(value))
+
+    def test_renders_with_template(self):
+        """Ensure the template can still be opted into."""
+        block = struct_blocks.LinkBlock(template="blocks/link_block.html")
+        value = block.to_python({"external_url": "https://omni-digital.co.uk"})
+        with self.assertTemplateUsed(template_name="blocks/link_block.html"):
+            content = block.render(value)
+
+        self.assertEqual("https://omni-digital.co.uk", content)
+
     def test_data_validation_external_and_internal_url(self):
         """Ensure that the data is validated as expected."""
         with self.assertRaises(ValidationError) as context:
@@ -0,0 +1,118 @@
+from django.template import engines
+from django.test import TestCase, override_settings
+from mock import patch
+
+from omni_blocks import template_cache
+from omni_blocks.blocks import struct_blocks, text_blocks
+from omni_blocks.template_cache import get_block_template
+
+
+class TestGetBlockTemplate(TestCase):
+    def setUp(self):
+        template_cache._get_cached_template.cache_clear()
+
+    @override_settings(OMNI_BLOCKS_CACHE_TEMPLATES=True)
+    def test_resolved_once(self):
+        """Ensure a template name is only resolved once when caching is enabled."""
+        with patch.object(
+            template_cache, "get_template", wraps=template_cache.get_template
+        ) as get_template:
+            first = get_block_template("blocks/column_block.html")
+            second = get_block_template("blocks/column_block.html")
+
+        self.assertIs(first, second)
+        self.assertEqual(get_template.call_count, 1)
+
+    @override_settings(OMNI_BLOCKS_CACHE_TEMPLATES=False)
+    def test_not_cached(self):
+        """Ensure templates are resolved on every call when caching is disabled."""
+        with patch.object(
+            template_cache, "get_template", wraps=template_cache.get_template
+        ) as get_template:
+            get_block_template("blocks/column_block.html")
+            get_block_template("blocks/column_block.html")
+
+        self.assertEqual(get_template.call_count, 2)
+
+    @override_settings(DEBUG=True)
+    def test_debug_default(self):
+        """Ensure templates are not cached by default while debugging."""
+        self.assertFalse(template_cache.cache_templates())
+
+    def test_cleared_on_setting_change(self):
+        """Ensure the resolved templates are forgotten when template settings change."""
+        cache_info = template_cache._get_cached_template.cache_info
+        with override_settings(OMNI_BLOCKS_CACHE_TEMPLATES=True):
+            get_block_template("blocks/column_block.html")
+            self.assertEqual(cache_info().currsize, 1)
+
+        self.assertEqual(cache_info().currsize, 0)
+
+
+@override_settings(OMNI_BLOCKS_CACHE_TEMPLATES=True, OMNI_BLOCKS_MINIFY_TEMPLATES=True)
+class TestMinifyTemplates(TestCase):
+    def setUp(self):
+        template_cache._get_cached_template.cache_clear()
+
+    def test_minify_html(self):
+        """Ensure comments are stripped and whitespace collapsed, but not IE comments."""
+        self.assertEqual(
+            template_cache.minify_html(
+                "<ul>\n    <li>A</li><!-- .item -->\n</ul>\n"
+                "<!--[if IE]><p>IE</p><![endif]-->"
+            ),
+            "<ul> <li>A</li> </ul> <!--[if IE]><p>IE</p><![endif]-->",
+        )
+
+    def test_minified_once(self):
+        """Ensure the cached template is minified as it is resolved."""
+        with patch.object(
+            template_cache, "minify_template", wraps=template_cache.minify_template
+        ) as minify_template:
+            template = get_block_template("blocks/flow_list_block.html")
+            get_block_template("blocks/flow_list_block.html")
+
+        self.assertEqual(minify_template.call_count, 1)
+        self.assertEqual(
+            template.render({"children": "A"}), '<ul class="flow_block__list"> A </ul> '
+        )
+
+    def test_script_not_minified(self):
+        """Ensure templates with scripts keep the newlines ending their line comments."""
+        source = "<script>\n  var a = 1; // set a\n  window.ready = true;\n</script>\n"
+        template = engines["django"].from_string(source)
+
+        self.assertIs(template_cache.minify_template(template), template)
+        self.assertEqual(template.render(), source)
+
+    def test_loader_template_unchanged(self):
+        """Ensure the template shared by Django's loaders keeps its formatting."""
+        get_block_template("blocks/flow_list_block.html")
+
+        self.assertIn(
+            "<!-- .flow_block__list -->",
+            template_cache.get_template("blocks/flow_list_block.html").render(),
+        )
+
+    @override_settings(OMNI_BLOCKS_CACHE_TEMPLATES=False)
+    def test_not_minified_without_cache(self):
+        """Ensure templates are only minified once they are cached."""
+        rendered = get_block_template("blocks/flow_list_block.html").render()
+
+        self.assertIn("<!-- .flow_block__list -->", rendered)
+
+    def test_blocks_minified(self):
+        """Ensure the heading, quote and link blocks render minified templates."""
+        blocks = [
+            (text_blocks.HBlock("h2"), "Heading"),
+            (text_blocks.JumpHBlock("h2"), "Heading"),
+            (text_blocks.PullQuoteBlock(), "Quote"),
+            (text_blocks.QuoteBlock(), "Quote"),
+            (
+                struct_blocks.ButtonBlock(),
+                {"title": "Button", "link": {"external_url": "https://example.com"}},
+            ),
+        ]
+        for block, value in blocks:
+            rendered = block.render(block.to_python(value))
+            self.assertNotIn("\n", rendered)
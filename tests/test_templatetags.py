@@ -1,12 +1,19 @@
 from __future__ import unicode_literals
 
-from mock import Mock
+from mock import Mock, patch
 
-from django.test import TestCase
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase
+from wagtail.core.blocks import StreamBlock
 from wagtail_factories import PageFactory
 
 from omni_blocks.blocks.text_blocks import JumpHBlock
-from omni_blocks.templatetags.omni_blocks_tags import has_jumplist, get_jumplist
+from omni_blocks.jumplist import JumplistIndex
+from omni_blocks.templatetags.omni_blocks_tags import (
+    get_jumplist,
+    get_jumplist_index,
+    has_jumplist,
+)
 
 
 class TestHasJumplist(TestCase):
@@ -41,3 +48,102 @@ class TestGetJumplist(TestCase):
         result = get_jumplist(self.page, "body")
 
         self.assertEqual(len(result), 3)
+
+
+class TestGetJumplistIndex(TestCase):
+    def setUp(self):
+        self.page = PageFactory.create(title="Page", parent=None)
+        self.block = JumpHBlock(tag="h2")
+        self.page.body = [
+            Mock(block=self.block, value="First"),
+            Mock(block=self.block, value="Second"),
+        ]
+        self.request = RequestFactory().get("/")
+
+    def test_index(self):
+        """Ensure the index holds both the boolean and the anchors."""
+        index = get_jumplist_index(self.page, "body")
+
+        self.assertTrue(index.has_jumplist)
+        self.assertEqual(
+            [anchor.href for anchor in index.anchors],
+            ["#heading-first", "#heading-second"],
+        )
+
+    def test_index_is_cached_per_request(self):
+        """Ensure the index is only built once per request."""
+        index = get_jumplist_index(self.page, "body", request=self.request)
+
+        self.assertIs(index, get_jumplist_index(self.page, "body", request=self.request))
+        other_request = RequestFactory().get("/")
+        self.assertIsNot(
+            index, get_jumplist_index(self.page, "body", request=other_request)
+        )
+
+    def test_tags_share_the_index(self):
+        """Ensure the template tags walk the streamfield only once per request."""
+        template = Template(
+            "{% load omni_blocks_tags %}"
+            "{% has_jumplist page 'body' as exists %}"
+            "{% get_jumplist page 'body' as anchors %}"
+            "{% get_jumplist_index page 'body' as jumplist %}"
+            "{{ exists }} {{ jumplist.has_jumplist }} "
+            "{% for anchor in anchors %}{{ anchor.href }} {% endfor %}"
+        )
+        context = Context({"page": self.page, "request": self.request})
+        with patch(
+            "omni_blocks.jumplist.JumplistIndex", wraps=JumplistIndex
+        ) as index_class:
+            rendered = template.render(context)
+
+        self.assertEqual(index_class.call_count, 1)
+        self.assertEqual(rendered, "True True #heading-first #heading-second ")
+
+    def test_heading_reuses_anchor(self):
+        """Ensure indexed JumpHBlocks render the anchors of the index."""
+        get_jumplist_index(self.page, "body", request=self.request)
+        value = self.page.body[1].value
+
+        for context in ({"request": self.request}, {}):
+            rendered = self.block.render(value, context=context)
+            self.assertIn('<h2 id="heading-second">', rendered)
+
+    def test_duplicate_headings(self):
+        """Ensure headings with the same text get unique anchors, as they render."""
+        self.page.body = [Mock(block=self.block, value="Intro") for _ in range(3)]
+        index = get_jumplist_index(self.page, "body", request=self.request)
+
+        self.assertEqual(
+            [anchor.href for anchor in index.anchors],
+            ["#heading-intro", "#heading-intro-2", "#heading-intro-3"],
+        )
+        anchor_ids = ["heading-intro", "heading-intro-2", "heading-intro-3"]
+        for item, anchor_id in zip(self.page.body, anchor_ids):
+            rendered = self.block.render(item.value, context={"request": self.request})
+            self.assertIn('<h2 id="{}">'.format(anchor_id), rendered)
+
+    def test_stream_renders_anchors(self):
+        """Ensure the headings of a stream render the jumplist anchors every time."""
+        stream_block = StreamBlock([("heading", self.block)])
+        self.page.body = stream_block.to_python(
+            [
+                {"type": "heading", "value": "Intro"},
+                {"type": "heading", "value": "Intro"},
+            ]
+        )
+
+        for request in (None, self.request, self.request):
+            index = get_jumplist_index(self.page, "body", request=request)
+            rendered = stream_block.render(self.page.body, context={"request": request})
+            for anchor in index.anchors:
+                self.assertIn('<h2 id="{}">'.format(anchor.href[1:]), rendered)
+
+    def test_index_is_cached_per_stream_value(self):
+        """Ensure the index of a StreamValue is only built once."""
+        stream_block = StreamBlock([("heading", self.block)])
+        self.page.body = stream_block.to_python([{"type": "heading", "value": "First"}])
+
+        self.assertIs(
+            get_jumplist_index(self.page, "body", request=self.request),
+            get_jumplist_index(self.page, "body", request=RequestFactory().get("/")),
+        )
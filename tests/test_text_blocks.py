@@ -1,4 +1,4 @@
-from django.test import TestCase
+from django.test import RequestFactory, TestCase
 from wagtail.core.blocks import CharBlock, BlockQuoteBlock
 
 from omni_blocks.blocks.text_blocks import HBlock, JumpHBlock, PullQuoteBlock, QuoteBlock
@@ -20,6 +20,25 @@ class TestHBlock(TestCase):
         self.assertEqual(result, expected)
 
 
+class TestHBlockSlugifiedId(TestCase):
+    """Tests for the HBlock slugified ids."""
+
+    def test_slugified_id(self):
+        """Test HBlock adds a slugified id."""
+        block = HBlock("h2", slugified_id=True)
+        result = block.render("Some Text", context={})
+
+        self.assertIn('id="some-text"', result)
+
+    def test_duplicate_slugified_ids(self):
+        """Test headings with the same text get unique ids within a request."""
+        block = HBlock("h2", slugified_id=True)
+        context = {"request": RequestFactory().get("/")}
+
+        self.assertIn('id="some-text"', block.render("Some Text", context=context))
+        self.assertIn('id="some-text-2"', block.render("Some Text", context=context))
+
+
 class TestJumpHBlock(TestCase):
     """Test the JumpHBlock block."""
 
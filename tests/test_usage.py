@@ -0,0 +1,91 @@
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils.six import StringIO
+from mock import patch
+from wagtail.core.blocks import CharBlock, StreamBlock
+
+from omni_blocks import usage
+from omni_blocks.blocks.image_blocks import ImageGridBlock
+from omni_blocks.blocks.list_blocks import BasicCardGridBlock
+from omni_blocks.blocks.struct_blocks import TitledLinkBlock
+
+
+class BodyBlock(StreamBlock):
+    images = ImageGridBlock()
+    cards = BasicCardGridBlock()
+    link = TitledLinkBlock()
+    heading = CharBlock()
+
+
+def card(page_id=None):
+    return {"title": "Card", "image": None, "link": {"internal_url": page_id}}
+
+
+class TestBlockUsage(TestCase):
+    def setUp(self):
+        self.block = BodyBlock()
+        self.pages = [
+            [
+                (
+                    self.block,
+                    [
+                        {"type": "images", "value": [1, 2, 3]},
+                        {"type": "heading", "value": "Hi"},
+                    ],
+                )
+            ],
+            [
+                (
+                    self.block,
+                    [
+                        {"type": "images", "value": [1]},
+                        {"type": "cards", "value": [card(1), card(), card(2)]},
+                        {
+                            "type": "link",
+                            "value": {"title": "Link", "link": {"internal_url": 1}},
+                        },
+                    ],
+                )
+            ],
+            [(self.block, None)],
+        ]
+
+    def test_add_page(self):
+        """Ensure the blocks, their lengths and the links of every page are counted."""
+        block_usage = usage.BlockUsage()
+        for streams in self.pages:
+            block_usage.add_page(streams)
+
+        self.assertEqual(block_usage.page_count, 3)
+        self.assertEqual(block_usage.blocks["ImageGridBlock"], 2)
+        self.assertEqual(block_usage.pages["ImageGridBlock"], 2)
+        self.assertEqual(block_usage.blocks["BasicCardBlock"], 3)
+        self.assertEqual(block_usage.pages["BasicCardBlock"], 1)
+        self.assertNotIn("CharBlock", block_usage.blocks)
+        self.assertEqual(block_usage.lengths["ImageGridBlock"].counts, {3: 1, 1: 1})
+        self.assertEqual(block_usage.links.counts, {0: 2, 3: 1})
+
+    def test_histogram(self):
+        """Ensure the percentiles are read from the counts."""
+        histogram = usage.Histogram()
+        for size in [1] * 50 + [2] * 45 + [10] * 5:
+            histogram.add(size)
+
+        self.assertEqual(len(histogram), 100)
+        self.assertEqual(histogram.summary(), "min 1, median 1, p95 2, max 10")
+
+    def test_command(self):
+        """Ensure the command reports the usage of every page."""
+        stdout = StringIO()
+        with patch.object(
+            usage, "iter_page_streams", return_value=iter(self.pages)
+        ) as pages:
+            call_command("block_usage", live=True, chunk_size=10, stdout=stdout)
+
+        pages.assert_called_once_with(live=True, chunk_size=10)
+        output = stdout.getvalue()
+        self.assertIn("Scanned 3 pages.", output)
+        self.assertIn(
+            "ImageGridBlock: 2 blocks on 2 pages\n    length: min 1, median 1", output
+        )
+        self.assertIn("Links per page: min 0, median 0, p95 3, max 3", output)
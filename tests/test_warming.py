@@ -0,0 +1,132 @@
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils.six import StringIO
+from mock import patch
+from wagtail.core.blocks import StreamBlock
+from wagtail.core.models import Page
+from wagtail.images.tests.utils import Image, get_test_image_file
+from wagtail_factories import PageFactory
+
+from omni_blocks import warming
+from omni_blocks.blocks.image_blocks import ImageGridBlock
+from omni_blocks.blocks.list_blocks import BasicCardGridBlock
+from omni_blocks.blocks.struct_blocks import TwoColumnBlock
+
+
+class BodyBlock(StreamBlock):
+    images = ImageGridBlock()
+    cards = BasicCardGridBlock()
+    columns = TwoColumnBlock()
+
+
+class TestWarming(TestCase):
+    def setUp(self):
+        self.images = [
+            Image.objects.create(title="Image {}".format(i), file=get_test_image_file())
+            for i in range(3)
+        ]
+        self.page = PageFactory.create(title="Page", parent=None)
+        self.page.body = BodyBlock().to_python(
+            [
+                {"type": "images", "value": [self.images[0].pk]},
+                {
+                    "type": "cards",
+                    "value": [{"title": "Card", "image": self.images[1].pk}],
+                },
+                {
+                    "type": "columns",
+                    "value": {
+                        "left_column": {"image": self.images[2].pk},
+                        "right_column": {"image": self.images[0].pk},
+                    },
+                },
+            ]
+        )
+
+    def test_collect_renditions(self):
+        """Ensure every spec rendered by the blocks is collected for its image."""
+        with patch.object(warming, "get_stream_field_names", return_value=["body"]):
+            renditions = warming.collect_renditions(self.page)
+
+        self.assertEqual(
+            renditions,
+            {
+                self.images[0]: {"width-1400", "fill-420x420-c100", "width-800"},
+                self.images[1]: {"fill-480x320-c100"},
+                self.images[2]: {"width-800"},
+            },
+        )
+
+    def test_warm_renditions(self):
+        """Ensure the missing renditions are generated."""
+        warming.warm_renditions({self.images[0]: {"width-800", "fill-420x420-c100"}})
+
+        self.assertEqual(
+            set(self.images[0].renditions.values_list("filter_spec", flat=True)),
+            {"width-800", "fill-420x420-c100"},
+        )
+
+    def test_publish_schedules_warming(self):
+        """Ensure publishing a page warms its renditions once the transaction commits."""
+        with self.settings(OMNI_BLOCKS_WARM_RENDITIONS=True), patch.object(
+            warming.transaction, "on_commit"
+        ) as on_commit:
+            self.page.save_revision().publish()
+
+        self.assertEqual(on_commit.call_count, 1)
+
+    def test_backfill_command(self):
+        """Ensure the command warms every page with a StreamField."""
+        page_type = ContentType.objects.get_for_model(Page)
+        with patch.object(
+            warming, "get_stream_page_types", return_value=[page_type]
+        ), patch.object(
+            warming, "warm_page_renditions", return_value={self.images[0]: {"width-800"}}
+        ) as warm:
+            stdout = StringIO()
+            call_command("backfill_renditions", workers=1, stdout=stdout)
+
+        self.assertEqual(warm.call_count, Page.objects.count())
+        self.assertIn(
+            "Warmed {0} renditions across {0} pages.".format(warm.call_count),
+            stdout.getvalue(),
+        )
+
+    def test_backfill_command_workers(self):
+        """Ensure the command totals the pages warmed in the worker pool."""
+        page_type = ContentType.objects.get_for_model(Page)
+        with patch.object(
+            warming, "get_stream_page_types", return_value=[page_type]
+        ), patch.object(
+            warming, "warm_page_renditions", return_value={self.images[0]: {"width-800"}}
+        ) as warm:
+            stdout = StringIO()
+            call_command("backfill_renditions", workers=2, stdout=stdout)
+
+        self.assertEqual(warm.call_count, Page.objects.count())
+        self.assertIn(
+            "Warmed {0} renditions across {0} pages.".format(warm.call_count),
+            stdout.getvalue(),
+        )
+
+    def test_backfill_command_errors(self):
+        """Ensure a page failing to warm is logged, and the other pages still warmed."""
+        page_type = ContentType.objects.get_for_model(Page)
+        results = [ValueError("Broken page")] + [{self.images[0]: {"width-800"}}] * (
+            Page.objects.count() - 1
+        )
+        with patch.object(
+            warming, "get_stream_page_types", return_value=[page_type]
+        ), patch.object(
+            warming, "warm_page_renditions", side_effect=results
+        ), self.assertLogs(warming.logger, "ERROR"):
+            stdout = StringIO()
+            call_command("backfill_renditions", workers=1, stdout=stdout)
+
+        self.assertIn(
+            "Warmed {} renditions across {} pages.".format(
+                Page.objects.count() - 1, Page.objects.count()
+            ),
+            stdout.getvalue(),
+        )